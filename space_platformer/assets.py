@@ -0,0 +1,156 @@
+# assets.py
+
+import pygame
+
+from collections import OrderedDict
+from os import PathLike
+
+
+class AssetCache:
+    """Shares loaded and scaled asset surfaces between sprites, keyed by (asset key, size)."""
+    __slots__ = (
+        '__asset_keys',
+        '__max_entries',
+        '__resolution',
+        '__originals',
+        '__scaled'
+    )
+
+    def __init__(
+        self,
+        asset_keys: dict[str, PathLike],
+        max_entries: int = 64
+    ) -> None:
+        self.__asset_keys = asset_keys
+        self.__max_entries = max_entries
+        self.__resolution: tuple[int, int] | None = None
+
+        # Decoded images at their original size, and the scaled copies in LRU order
+        self.__originals: dict[str, pygame.Surface] = {}
+        self.__scaled: OrderedDict[tuple[str, tuple[int, int] | None], pygame.Surface] = OrderedDict()
+
+    '''FUNCTIONS'''
+
+    def get(self, key: str, size: tuple[int, int] | None = None) -> pygame.Surface:
+        """Return the surface for an asset key, scaled to size if given. Callers must not draw on it."""
+        if (surface := self.__scaled.get((key, size))) is not None:
+            self.__scaled.move_to_end((key, size))
+            return surface
+
+        surface = self.__load(key)
+        if size is not None:
+            surface = pygame.transform.scale(surface, size)
+
+        self.__scaled[(key, size)] = surface
+        while len(self.__scaled) > self.__max_entries:
+            self.__scaled.popitem(last=False)
+
+        return surface
+
+    def add(self, key: str, surface: pygame.Surface) -> None:
+        """Adopt an asset decoded elsewhere, like on a loader thread, converting it for the display."""
+        if key not in self.__originals:
+            self.__originals[key] = surface.convert_alpha()
+
+    def invalidate(self, key: str | None = None) -> None:
+        """Drop the cached surfaces of one asset key, or of every key."""
+        if key is None:
+            self.__originals.clear()
+            self.__scaled.clear()
+            return
+
+        self.__originals.pop(key, None)
+        for cached_key in [cached_key for cached_key in self.__scaled if cached_key[0] == key]:
+            del self.__scaled[cached_key]
+
+    def __load(self, key: str) -> pygame.Surface:
+        """Decode an asset from disk once."""
+        if (surface := self.__originals.get(key)) is None:
+            try:
+                surface = pygame.image.load(self.__asset_keys[key]).convert_alpha()
+            except pygame.error as e:
+                raise RuntimeError(f"Failed to load asset image: {e}") from e
+            self.__originals[key] = surface
+
+        return surface
+
+    '''GETTERS'''
+
+    @property
+    def resolution(self) -> tuple[int, int] | None: return self.__resolution
+    @property
+    def max_entries(self) -> int: return self.__max_entries
+
+    @resolution.setter
+    def resolution(self, resolution: tuple[int, int]) -> None:
+        # Scaled surfaces are sized for the old resolution, so none of them will be asked for again
+        if resolution != self.__resolution:
+            self.__scaled.clear()
+        self.__resolution = resolution
+    @max_entries.setter
+    def max_entries(self, max_entries: int) -> None:
+        self.__max_entries = max_entries
+        while len(self.__scaled) > self.__max_entries:
+            self.__scaled.popitem(last=False)
+
+    '''DUNDERS'''
+
+    def __len__(self) -> int:
+        return len(self.__scaled)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__originals
+
+
+class TextCache:
+    """Keeps rendered text surfaces keyed by (text, font, colors), evicting the least recently used."""
+    __slots__ = (
+        '__max_entries',
+        '__surfaces'
+    )
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.__max_entries = max_entries
+        self.__surfaces: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+
+    '''FUNCTIONS'''
+
+    def render(
+        self,
+        text: str,
+        font: pygame.font.Font,
+        color: tuple[int, int, int],
+        background: tuple[int, int, int] | None = None,
+        antialias: bool = False,
+        alpha: int | None = None
+    ) -> pygame.Surface:
+        """Return the rendered text, only going through the font the first time. Callers must not draw on it."""
+        key = (text, font, color, background, antialias, alpha)
+        if (surface := self.__surfaces.get(key)) is not None:
+            self.__surfaces.move_to_end(key)
+            return surface
+
+        surface = font.render(text, antialias, color, background)
+        if alpha is not None:
+            surface = surface.convert_alpha()  # Allow per-pixel changes
+            surface.set_alpha(alpha)
+
+        self.__surfaces[key] = surface
+        while len(self.__surfaces) > self.__max_entries:
+            self.__surfaces.popitem(last=False)
+
+        return surface
+
+    def clear(self) -> None:
+        """Drop every cached surface."""
+        self.__surfaces.clear()
+
+    '''GETTERS'''
+
+    @property
+    def max_entries(self) -> int: return self.__max_entries
+
+    '''DUNDERS'''
+
+    def __len__(self) -> int:
+        return len(self.__surfaces)
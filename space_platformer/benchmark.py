@@ -0,0 +1,183 @@
+# benchmark.py
+"""
+Times the hot paths of the game on the shipped maps and on large synthetic ones.
+
+    python space_platformer/benchmark.py --output bench.json
+    python space_platformer/benchmark.py --baseline bench.json
+
+Run from the repository root, like the game itself.
+"""
+import os
+
+# pygame greets on stdout when imported, which would end up in the JSON
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from os import PathLike
+from typing import Callable
+
+from settings import Settings
+
+
+def time_call(function: Callable[[], None], repeat: int, setup: Callable[[], None] | None = None) -> dict[str, float]:
+    """Run a function repeat times and summarize the wall times in seconds."""
+    samples: list[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+
+    return {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.fmean(samples),
+        'max': max(samples),
+        'repeat': repeat
+    }
+
+
+def make_synthetic_map(settings: Settings, size: int, directory: PathLike, seed: int = 0) -> str:
+    """Write a size x size map image with a walled border, random platforms, a goal and a spawn."""
+    colors = {type_: tuple(channel * 255 for channel in key) for key, type_ in settings.map_color_keys.items()}
+    rng = random.Random(seed)
+
+    image = pygame.Surface((size, size), pygame.SRCALPHA)
+    image.fill((0, 0, 0, 0))
+    pygame.draw.rect(image, colors["WALL"], image.get_rect(), 1)
+
+    # Horizontal platforms covering roughly a tenth of the map
+    for _ in range(size * size // 80):
+        x, y = rng.randrange(1, size - 1), rng.randrange(1, size - 1)
+        pygame.draw.line(image, colors["WALL"], (x, y), (min(x + rng.randint(2, 12), size - 2), y))
+
+    image.set_at((size - 2, 1), colors["GOAL"])
+    image.set_at((1, size - 2), colors["PLAYER"])
+
+    filepath = os.path.join(directory, f"synthetic_{size}.png")
+    pygame.image.save(image, filepath)
+    return filepath
+
+
+def benchmark_map(settings: Settings, filepath: PathLike, repeat: int) -> dict[str, dict[str, float]]:
+    """Time every phase of one map, through the same public calls the game makes."""
+    from map import Map
+    from map_format import decode_map
+
+    display = settings.display
+    decoded = decode_map(filepath, settings.map_color_keys)
+    map_ = Map(settings, filepath=filepath, display=display, decoded=decoded)
+    player = map_.player
+
+    def physics() -> None:
+        motion = player.step(1 / settings.simulation_tick_rate)
+        position, _ = map_.move(player.exact_position, player.rect.size, motion)
+        player.move_to(position)
+
+    def render() -> None:
+        map_.render(display)
+        display.flush()
+
+    def full_present() -> None:
+        display.invalidate()
+        display.update({})
+
+    return {
+        'load': time_call(lambda: decode_map(filepath, settings.map_color_keys), repeat),
+        'build': time_call(lambda: Map(settings, filepath=filepath, display=display, decoded=decoded), repeat),
+        'render': time_call(render, repeat),
+        'physics': time_call(physics, repeat),
+        'collision': time_call(lambda: map_.contacts((player.rect, player.grounded_rect), settings.player_contact_mask), repeat),
+        'display_update': time_call(full_present, repeat)
+    }
+
+
+def run(sizes: list[int], repeat: int) -> dict:
+    """Benchmark the shipped maps and one synthetic map per size."""
+    settings = Settings(headless=True, run=False)
+
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    for name, filepath in settings.maps.items():
+        results[name] = benchmark_map(settings, filepath, repeat)
+        print(f"{name}: done", file=sys.stderr)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            filepath = make_synthetic_map(settings, size, directory)
+            results[f"synthetic_{size}"] = benchmark_map(settings, filepath, repeat)
+            print(f"synthetic_{size}: done", file=sys.stderr)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print the median of every case against the baseline and return the regressed ones.
+
+    The table goes to stderr, so the JSON on stdout can still be piped.
+    """
+    regressions: list[str] = []
+
+    print(f"{'case':<32}{'baseline ms':>14}{'current ms':>14}{'ratio':>8}", file=sys.stderr)
+    for map_name, phases in current['results'].items():
+        for phase, timing in phases.items():
+            if (base := baseline['results'].get(map_name, {}).get(phase)) is None:
+                continue
+
+            ratio = timing['median'] / base['median'] if base['median'] else float('inf')
+            case = f"{map_name}.{phase}"
+            flag = ""
+            if ratio > 1 + tolerance:
+                regressions.append(case)
+                flag = "  REGRESSION"
+            print(f"{case:<32}{base['median'] * 1000:>14.3f}{timing['median'] * 1000:>14.3f}{ratio:>8.2f}{flag}", file=sys.stderr)
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark map load, build, render, collision and display update.")
+    parser.add_argument('--sizes', type=int, nargs='*', default=[64, 256, 512], help="side lengths of the synthetic maps")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per phase")
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    parser.add_argument('--baseline', help="compare against results from an earlier run")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="allowed slowdown before a case counts as a regression")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if regressions := compare(results, baseline, args.tolerance):
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
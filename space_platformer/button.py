@@ -16,6 +16,8 @@ class Button(pygame.sprite.Sprite, Renderable, Clickable):
         '__debug_color',
         '__surface',
         '__effect',
+        '__target',
+        '__hovered',
         '__rect'
     )
 
@@ -24,6 +26,7 @@ class Button(pygame.sprite.Sprite, Renderable, Clickable):
         surface: pygame.Surface,
         topleft: tuple[int, int] = (0, 0),
         effect: Callable | None = None,
+        target: str | None = None,
         debug_color: tuple[int, int, int] | None = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
     ) -> None:
         super().__init__()
@@ -31,6 +34,8 @@ class Button(pygame.sprite.Sprite, Renderable, Clickable):
         self.__debug_color = debug_color
         self.__surface = surface
         self.__effect = effect
+        self.__target = target  # Gamestate the button leads to, if any
+        self.__hovered = False
 
         self.__rect = pygame.Rect(*topleft, *surface.get_size())
 
@@ -41,22 +46,21 @@ class Button(pygame.sprite.Sprite, Renderable, Clickable):
         if self.__effect is not None:
             self.__effect()
 
-    def render(
-        self,
-        display: Display,
-        pos: tuple[int, int] | None = None
-    ) -> None:
-        """Renders the given surface by blitting text surfaces at the specified position."""
-        if pos is None:
-            pos = self.__rect.topleft
-        else:
-            self.__rect.topleft = pos
+    def hover_enter(self) -> None:
+        """Called when the mouse moves onto the button."""
+        self.__hovered = True
+
+    def hover_leave(self) -> None:
+        """Called when the mouse moves off the button."""
+        self.__hovered = False
 
-        display.blit(self.__surface, self.__rect.topleft)
+    def render(self, display: Display) -> None:
+        """Renders the text surface where the button is, buttons do not move once their scene has filed them for hit-testing."""
+        display.queue_blit(self.__surface, self.__rect.topleft)
 
     def debug(self, display: Display) -> None:
-        """Draws a debug rectangle on the given surface."""
-        pygame.draw.rect(display.internal_surface, self.__debug_color, self.__rect, 1)
+        """Draws a debug rectangle on the given surface, thicker while hovered."""
+        pygame.draw.rect(display.internal_surface, self.__debug_color, self.__rect, 3 if self.__hovered else 1)
 
     '''DUNDERS'''
 
@@ -64,4 +68,8 @@ class Button(pygame.sprite.Sprite, Renderable, Clickable):
         return f"Button\n  rect={str(self.__rect.topleft)}, ({str(self.__rect.left)}, {str(self.__rect.height)}),\n  effect={inspect.getsource(self.__effect)[15:]}"
     
     @property
-    def rect(self) -> pygame.Rect: return self.__rect
\ No newline at end of file
+    def rect(self) -> pygame.Rect: return self.__rect
+    @property
+    def target(self) -> str | None: return self.__target
+    @property
+    def hovered(self) -> bool: return self.__hovered
\ No newline at end of file
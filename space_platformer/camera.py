@@ -0,0 +1,54 @@
+# camera.py
+
+import pygame
+
+
+class Camera:
+    """Window onto the world, follows a target while staying inside the world bounds."""
+    __slots__ = (
+        '__viewport',
+        '__bounds'
+    )
+
+    def __init__(
+        self,
+        viewport_size: tuple[int, int],
+        bounds: pygame.Rect
+    ) -> None:
+        self.__viewport = pygame.Rect((0, 0), viewport_size)
+        self.__bounds = pygame.Rect(bounds)
+        self.__clamp()
+
+    '''FUNCTIONS'''
+
+    def follow(self, target: pygame.Rect) -> None:
+        """Center the viewport on a rect, as far as the bounds allow."""
+        self.__viewport.center = target.center
+        self.__clamp()
+
+    def to_screen(self, rect: pygame.Rect) -> pygame.Rect:
+        """A world rect moved into screen coordinates."""
+        return rect.move(-self.__viewport.x, -self.__viewport.y)
+
+    def __clamp(self) -> None:
+        """Keep the viewport inside the bounds, centered on them along an axis they do not fill."""
+        viewport, bounds = self.__viewport, self.__bounds
+
+        if bounds.width <= viewport.width:
+            viewport.centerx = bounds.centerx
+        else:
+            viewport.x = min(max(viewport.x, bounds.left), bounds.right - viewport.width)
+
+        if bounds.height <= viewport.height:
+            viewport.centery = bounds.centery
+        else:
+            viewport.y = min(max(viewport.y, bounds.top), bounds.bottom - viewport.height)
+
+    '''GETTERS'''
+
+    @property
+    def viewport(self) -> pygame.Rect: return self.__viewport.copy()
+    @property
+    def offset(self) -> tuple[int, int]: return self.__viewport.topleft
+    @property
+    def bounds(self) -> pygame.Rect: return self.__bounds.copy()
@@ -1,9 +1,12 @@
 # config.py
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 from abc import ABC, abstractmethod
 
+from spatial import HitTestIndex
+
 if TYPE_CHECKING:
+    import pygame
     from display import Display
 
 
@@ -25,6 +28,87 @@ class Renderable(ABC):
         """Render the object on the display."""
         pass
 
+    def dirty_rects(self) -> list['pygame.Rect']:
+        """Regions the object changed since it was last rendered, static objects report none."""
+        return []
+
 class Scene():
-    """Subclass for all scenes."""
-    pass
\ No newline at end of file
+    """Subclass for all scenes, keeps its objects sorted by what the main loop does with them."""
+    __slots__ = (
+        '__objects',
+        '__renderables',
+        '__clickables',
+        '__debuggables',
+        '__hit_index'
+    )
+
+    def __init__(self) -> None:
+        self.__objects: list[Any] = []
+        self.__renderables: list[Renderable] = []
+        self.__clickables: list[Clickable] = []
+        self.__debuggables: list[Any] = []
+        self.__hit_index = HitTestIndex()  # Clickables by position, for clicks and hover
+
+    '''FUNCTIONS'''
+
+    def add(self, object_: Any) -> None:
+        """Add an object to the scene and to every list it belongs in."""
+        self.__objects.append(object_)
+        self.__sort(object_)
+
+    def remove(self, object_: Any) -> None:
+        """Remove an object from the scene."""
+        self.__objects.remove(object_)
+        for objects in (self.__renderables, self.__clickables, self.__debuggables):
+            if object_ in objects:
+                objects.remove(object_)
+        self.__hit_index.remove(object_)
+
+    def replace(self, old: Any, new: Any) -> None:
+        """Put an object in the place of another, like a built map over its path."""
+        self.__objects[self.__objects.index(old)] = new
+        self.__resort()
+
+    def activate(self) -> None:
+        """Called every time the scene becomes the active one, it is only built the first time."""
+        pass
+
+    def __sort(self, object_: Any) -> None:
+        """File an object under the lists it belongs in."""
+        if isinstance(object_, Renderable):
+            self.__renderables.append(object_)
+        if isinstance(object_, Clickable):
+            self.__clickables.append(object_)
+            self.__hit_index.insert(object_)
+        if hasattr(object_, 'debug'):
+            self.__debuggables.append(object_)
+
+    def __resort(self) -> None:
+        """Rebuild every list from the objects, keeping their order."""
+        self.__renderables.clear()
+        self.__clickables.clear()
+        self.__debuggables.clear()
+        self.__hit_index.clear()
+        for object_ in self.__objects:
+            self.__sort(object_)
+
+    '''GETTERS'''
+
+    @property
+    def objects(self) -> list[Any]: return self.__objects
+    @property
+    def renderables(self) -> list[Renderable]: return self.__renderables
+    @property
+    def clickables(self) -> list[Clickable]: return self.__clickables
+    @property
+    def debuggables(self) -> list[Any]: return self.__debuggables
+    @property
+    def hit_index(self) -> HitTestIndex: return self.__hit_index
+
+    @objects.setter
+    def objects(self, value: list[Any]) -> None:
+        if isinstance(value, list):
+            self.__objects = value
+            self.__resort()
+        else:
+            raise TypeError("Expected a list")
\ No newline at end of file
@@ -2,10 +2,14 @@
 
 import pygame
 
+import os
+import sys
+from math import gcd
 from typing import Any
 
 from settings import Settings
 from config import color
+from assets import TextCache
 
 
 class Display:
@@ -17,20 +21,35 @@ class Display:
         '__font',
         '__debug_font',
         '__internal_surface',
-        '__screen'
+        '__screen',
+        '__present_mode',
+        '__dirty_mode',
+        '__dirty_rects',
+        '__headless',
+        '__text_cache',
+        '__blit_queue'
     )
 
+    # pygame-ce's fblits() skips building the list of rects that blits() returns
+    __HAS_FBLITS = hasattr(pygame.Surface, 'fblits')
+
     def __init__(
         self,
         settings: Settings,
         internal_resolution: tuple[int, int] = None,
         external_resolution: tuple[int, int] = None,
-        title: str = "unnamed"
+        title: str = "unnamed",
+        dirty_mode: bool = False,
+        headless: bool = False
     ) -> None:
-        from ctypes import windll
+        if headless:
+            # SDL renders into memory, no window or video device is needed
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+        elif sys.platform == "win32":
+            from ctypes import windll
 
-        # Make the screen not die
-        windll.user32.SetProcessDPIAware()
+            # Make the screen not die
+            windll.user32.SetProcessDPIAware()
 
         # Initialize Pygame
         pygame.init()
@@ -42,26 +61,126 @@ class Display:
         self.__internal_resolution = settings.internal_resolution if internal_resolution is None else internal_resolution
         self.__external_resolution = settings.external_resolution if external_resolution is None else external_resolution
         self.__title = title
+        self.__headless = headless
+        self.__text_cache = TextCache(max_entries=settings.text_cache_size)
         
         # Set the font
         self.font = pygame.font.SysFont("Arial", self.__internal_resolution[0] // self.__settings.font_scale_factor)
 
-        # Create internal surface for rendering
-        self.__internal_surface = pygame.Surface(self.__internal_resolution)
-        
         # Create the main display surface
         self.__screen = pygame.display.set_mode(self.__external_resolution)  # Fullscreen can be enabled with pygame.FULLSCREEN
 
+        # Create internal surface for rendering, after the screen so it shares its pixel format
+        if self.__internal_resolution == self.__external_resolution:
+            # Nothing to scale, render straight onto the screen
+            self.__present_mode = "direct"
+            self.__internal_surface = self.__screen
+        else:
+            self.__present_mode = "scale"
+            self.__internal_surface = pygame.Surface(self.__internal_resolution)
+
+        # Only present the regions that changed, the first frame is always a full one
+        self.__dirty_mode = dirty_mode
+        self.__dirty_rects: list[pygame.Rect] = [self.__internal_surface.get_rect()]
+
+        # Blits submitted during a frame, drawn in one call by flush()
+        self.__blit_queue: list[tuple[pygame.Surface, tuple[int, int]]] = []
+
     '''FUNCTIONS'''
 
     def fill(self, new: color) -> None:
         """Fill the internal surface with a color."""
+        self.flush()
         self.__internal_surface.fill(new)
 
     def blit(self, source: pygame.Surface, dest: tuple[int, int]) -> None:
-        """Blit a source surface onto the internal surface at a given position."""
+        """Blit a source surface onto the internal surface at a given position, after anything queued."""
+        self.flush()
         self.__internal_surface.blit(source, dest)
 
+    def queue_blit(self, source: pygame.Surface, dest: tuple[int, int]) -> None:
+        """Submit a blit to be drawn with the rest of the frame on the next flush."""
+        self.__blit_queue.append((source, dest))
+
+    def queue_blits(self, blits: list[tuple[pygame.Surface, tuple[int, int]]]) -> None:
+        """Submit several blits at once, drawn in order on the next flush."""
+        self.__blit_queue.extend(blits)
+
+    def flush(self) -> None:
+        """Draw every queued blit in a single call."""
+        if not self.__blit_queue:
+            return
+
+        if self.__HAS_FBLITS:
+            self.__internal_surface.fblits(self.__blit_queue)
+        else:
+            self.__internal_surface.blits(self.__blit_queue, doreturn=False)
+        self.__blit_queue.clear()
+
+    def render_text(
+        self,
+        text: str,
+        font: pygame.font.Font | None = None,
+        color: color = (0, 0, 0),
+        background: color | None = None,
+        antialias: bool = False,
+        alpha: int | None = None
+    ) -> pygame.Surface:
+        """Render text through the cache, in the main font unless another is given."""
+        return self.__text_cache.render(text, self.__font if font is None else font, color, background, antialias, alpha)
+
+    def invalidate(self, rect: pygame.Rect | None = None) -> None:
+        """Mark a region of the internal surface as changed, or all of it if no rect is given."""
+        self.__dirty_rects.append(self.__internal_surface.get_rect() if rect is None else pygame.Rect(rect))
+
+    def __merge_dirty_rects(self) -> None:
+        """Clip the dirty rects to the surface and union the ones that overlap."""
+        bounds = self.__internal_surface.get_rect()
+
+        merged: list[pygame.Rect] = []
+        for rect in self.__dirty_rects:
+            if not (rect := rect.clip(bounds)):
+                continue
+
+            # Swallow every merged rect this one touches, the union may then touch more
+            while (index := rect.collidelist(merged)) != -1:
+                rect.union_ip(merged.pop(index))
+            merged.append(rect)
+
+        self.__dirty_rects = merged
+
+    def __present_dirty_rects(self) -> None:
+        """Scale only the dirty regions onto the screen and push them to the window."""
+        if self.__present_mode == "direct":
+            pygame.display.update(self.__dirty_rects)
+            return
+
+        (internal_width, internal_height), (external_width, external_height) = self.__internal_resolution, self.__external_resolution
+
+        # Smallest blocks of internal pixels that scale to whole screen pixels, a region
+        # made of whole blocks scales to exactly the pixels the whole frame would
+        grid_x = internal_width // gcd(internal_width, external_width)
+        grid_y = internal_height // gcd(internal_height, external_height)
+        bounds = self.__internal_surface.get_rect()
+
+        screen_rects: list[pygame.Rect] = []
+        for rect in self.__dirty_rects:
+            left, top = rect.left // grid_x * grid_x, rect.top // grid_y * grid_y
+            right, bottom = -(-rect.right // grid_x) * grid_x, -(-rect.bottom // grid_y) * grid_y
+            rect = pygame.Rect(left, top, right - left, bottom - top).clip(bounds)
+
+            screen_left, screen_top = rect.left * external_width // internal_width, rect.top * external_height // internal_height
+            screen_rect = pygame.Rect(
+                screen_left, screen_top,
+                rect.right * external_width // internal_width - screen_left,
+                rect.bottom * external_height // internal_height - screen_top
+            )
+
+            pygame.transform.scale(self.__internal_surface.subsurface(rect), screen_rect.size, self.__screen.subsurface(screen_rect))
+            screen_rects.append(screen_rect)
+
+        pygame.display.update(screen_rects)
+
     def debug(self, values: dict[str, Any]) -> None:
         """Draw debug information on the internal surface."""
         # Draw a border around the internal surface
@@ -75,24 +194,55 @@ class Display:
         if (button := values.get('button_hover', False)):
             repr_text = repr(button).split('\n')
             for i, line in enumerate(repr_text):
-                button_debug_surface = self.__debug_font.render(line, False, (0, 0, 0), (255, 255, 255))
-                button_debug_surface = button_debug_surface.convert_alpha()
-                button_debug_surface = button_debug_surface.convert_alpha() # Allow per-pixel changes
-                button_debug_surface.set_alpha(128)  # Semi-transparent
+                button_debug_surface = self.render_text(line, self.__debug_font, (0, 0, 0), (255, 255, 255), alpha=128)  # Semi-transparent
                 self.__internal_surface.blit(button_debug_surface, (mouse_pos[0], mouse_pos[1] + i * self.__debug_font.get_height()))
 
         # Draw the title
-        title_surface = self.__font.render(self.__title, True, (255, 255, 255))
+        title_surface = self.render_text(self.__title, self.__font, (255, 255, 255), antialias=True)
         self.__internal_surface.blit(title_surface, (10, 10))
 
+        # Frame timings under the title
+        if (profiler := values.get('profiler', None)) is not None:
+            self.__draw_profiler(profiler, (10, 10 + title_surface.get_height()))
+
+    def __draw_profiler(self, profiler: Any, topleft: tuple[int, int]) -> None:
+        """Draw the rolling frame timings per phase and a histogram of whole frame times."""
+        x, y = topleft
+        line_height = self.__debug_font.get_height()
+
+        for name, stats in profiler.summary.items():
+            line = f"{name:<10} avg {stats['mean']:6.2f}  p95 {stats['p95']:6.2f}  p99 {stats['p99']:6.2f} ms"
+            # New numbers every frame, caching them would only push useful text out
+            self.__internal_surface.blit(self.__debug_font.render(line, False, (0, 0, 0), (255, 255, 255)), (x, y))
+            y += line_height
+
+        # One bar per bin, scaled to the fullest bin
+        if not (counts := profiler.histogram('frame')) or not (highest := max(counts)):
+            return
+        bar_width, graph_height = 6, line_height * 3
+        for i, count in enumerate(counts):
+            bar_height = round(count / highest * graph_height)
+            pygame.draw.rect(self.__internal_surface, (255, 0, 0), (x + i * bar_width, y + graph_height - bar_height, bar_width - 1, bar_height))
+
     def update(self, values: dict[str, Any]) -> None:
         """Update the display with the current internal surface."""
+        self.flush()
+
         if values.get('debug_mode', False):
             self.debug(values)
+            self.invalidate()
 
-        scaled_surface = pygame.transform.scale(self.__internal_surface, self.__external_resolution)
-        self.__screen.blit(scaled_surface, (0, 0))
-        pygame.display.flip()
+        if self.__dirty_mode:
+            # Nothing changed, nothing to present
+            if self.dirty_regions:
+                self.__present_dirty_rects()
+        else:
+            # Scale straight into the screen instead of allocating a scaled copy every frame
+            if self.__present_mode == "scale":
+                pygame.transform.scale(self.__internal_surface, self.__external_resolution, self.__screen)
+            pygame.display.flip()
+
+        self.__dirty_rects.clear()
 
     @property
     def font(self) -> pygame.font.Font: return self.__font
@@ -104,7 +254,24 @@ class Display:
     def internal_surface(self) -> pygame.Surface: return self.__internal_surface
     @property
     def screen(self) -> pygame.Surface: return self.__screen
+    @property
+    def present_mode(self) -> str: return self.__present_mode
+    @property
+    def dirty_mode(self) -> bool: return self.__dirty_mode
+    @property
+    def headless(self) -> bool: return self.__headless
+    @property
+    def dirty_regions(self) -> list[pygame.Rect]:
+        self.__merge_dirty_rects()
+        return self.__dirty_rects
+    @property
+    def clip(self) -> pygame.Rect: return self.__internal_surface.get_clip()
 
+    @clip.setter
+    def clip(self, rect: pygame.Rect | None) -> None:
+        # Queued blits belong to the old clip
+        self.flush()
+        self.__internal_surface.set_clip(rect)
     @font.setter
     def font(self, font: pygame.font.Font) -> None:
         self.__font = font
@@ -0,0 +1,77 @@
+# loader.py
+
+import pygame
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from os import PathLike
+from typing import Any
+
+from settings import Settings
+from map_format import DecodedMap, decode_map
+
+
+class Loader:
+    """Decodes map images and asset files on worker threads so the main loop keeps running."""
+    __slots__ = (
+        '__settings',
+        '__executor',
+        '__maps',
+        '__assets'
+    )
+
+    def __init__(
+        self,
+        settings: Settings,
+        max_workers: int = 2
+    ) -> None:
+        self.__settings = settings
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="loader")
+
+        self.__maps: dict[PathLike, Future] = {}
+        self.__assets: dict[str, Future] = {}
+
+    '''FUNCTIONS'''
+
+    def request(self, filepath: PathLike) -> None:
+        """Start decoding a map and any asset file that is not loaded yet, does nothing if already started."""
+        if filepath not in self.__maps:
+            self.__maps[filepath] = self.__executor.submit(decode_map, filepath, self.__settings.map_color_keys)
+
+        for key, asset_path in self.__settings.map_asset_keys.items():
+            if key not in self.__assets and key not in self.__settings.assets:
+                self.__assets[key] = self.__executor.submit(pygame.image.load, asset_path)
+
+    def ready(self, filepath: PathLike) -> bool:
+        """Whether the map and every pending asset file have finished decoding."""
+        return all(future.done() for future in self.__jobs(filepath))
+
+    def progress(self, filepath: PathLike) -> float:
+        """Fraction of the work for a map that is done."""
+        if not (jobs := self.__jobs(filepath)):
+            return 1.0
+        return sum(future.done() for future in jobs) / len(jobs)
+
+    def finish(self, filepath: PathLike) -> DecodedMap:
+        """Hand the decoded map over, converting the decoded assets on this thread. Blocks until ready."""
+        # Surface conversion needs the display, which belongs to the main thread
+        for key, future in list(self.__assets.items()):
+            del self.__assets[key]
+            try:
+                self.__settings.assets.add(key, future.result())
+            except pygame.error as e:
+                raise RuntimeError(f"Failed to load asset image: {e}") from e
+
+        return self.__maps.pop(filepath).result()
+
+    def shutdown(self) -> None:
+        """Stop the workers, dropping anything not started yet."""
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+
+    def __jobs(self, filepath: PathLike) -> list[Future]:
+        """Every job a map is waiting on."""
+        return ([self.__maps[filepath]] if filepath in self.__maps else []) + list(self.__assets.values())
+
+    '''DUNDERS'''
+
+    def __contains__(self, filepath: Any) -> bool:
+        return filepath in self.__maps
@@ -2,23 +2,81 @@
 
 import pygame
 
+from collections import OrderedDict
+from math import floor
 from os import PathLike
+from typing import Sequence
 
 from settings import Settings
 from config import Renderable
 from display import Display
 import map_objects
+from map_objects import CollisionRect
 from player import Player
+from spatial import SpatialHash
+from physics import Contact, move
+from camera import Camera
+from map_format import DecodedMap, build_collision_geometry, decode_map, tile_rect
+from tile_grid import TileGrid
+
+
+class MapChunk:
+    """Square block of map tiles drawn into one surface, with the collision rects and bricks inside it."""
+    __slots__ = (
+        '__position',
+        '__rect',
+        '__surface',
+        '__collision_rects',
+        '__bricks'
+    )
+
+    def __init__(
+        self,
+        position: tuple[int, int],
+        rect: pygame.Rect,
+        surface: pygame.Surface | None,
+        collision_rects: list[CollisionRect],
+        bricks: list[map_objects.Brick]
+    ) -> None:
+        self.__position = position
+        self.__rect = rect
+        self.__surface = surface
+        self.__collision_rects = collision_rects
+        self.__bricks = bricks
+
+    '''GETTERS'''
+
+    @property
+    def position(self) -> tuple[int, int]: return self.__position
+    @property
+    def rect(self) -> pygame.Rect: return self.__rect
+    @property
+    def surface(self) -> pygame.Surface | None: return self.__surface
+    @property
+    def collision_rects(self) -> list[CollisionRect]: return self.__collision_rects
+    @property
+    def bricks(self) -> list[map_objects.Brick]: return self.__bricks
 
 
 class Map(Renderable):
     __slots__ = (
         '__settings',
-        "__simple_game_map",
+        "__tile_grid",
         "__map_objects",
         "__collidable_objects",
+        "__spatial_index",
         "__player_spawn_pos",
+        "__goals",
+        "__collision_geometry",
+        "__chunk_geometry",
+        "__chunks",
+        "__solid_ids",
+        "__tile_surfaces",
+        "__camera",
+        "__rendered_offset",
         "__player",
+        "__tile_size",
+        "__offset",
         "__display"
     )
 
@@ -26,96 +84,302 @@ class Map(Renderable):
         self,
         settings: Settings,
         filepath: PathLike,
-        display: Display
+        display: Display,
+        decoded: DecodedMap | None = None
     ) -> None:
         self.__settings: Settings = settings
 
-        self.__load(filepath)
+        # Maps decoded ahead of time, by the loader, skip the file
+        if decoded is None:
+            self.__load(filepath)
+        else:
+            self.__unpack(decoded)
 
         self.__display: Display = display
-        self.__map_objects: list[map_objects.Brick] = []
         self.__build_map()
 
     def __load(self, filepath: PathLike) -> None:
-        """Load the map from the file."""
-        try:
-            image: pygame.Surface = pygame.image.load(filepath).convert_alpha()
-        except pygame.error as e:
-            raise RuntimeError(f"Failed to load map image: {e}") from e
-        
-        width, height = image.get_size()
-        
-        self.__simple_game_map: list[list[str | None]] = []
-        self.__player_pos: tuple[int, int] | None = None
-
-        # Create a simple game map based on the image colors
-        for y in range(height):
-            row: list[str] = []
-            for x in range(width):
-                color = tuple(round(x) for x in image.get_at((x, y)).normalize())
-                if (type_ := self.__settings.map_color_keys.get(color, None)) != "PLAYER":
-                    row.append(type_)
-                else:
-                    row.append(None)
-                    self.__player_spawn_pos = (x, y)
-
-            self.__simple_game_map.append(row)
-
-        # Place the player in the first empty space if not already placed
-        if self.__player_pos is None:
-            for y in range(height):
-                for x in range(width):
-                    if self.__simple_game_map[y][x] is None:
-                        self.__player_pos = (x, y)
-                        break
-
-                if self.__player_pos is not None:
-                    break
+        """Load the map from the file, or from its compiled file when that is up to date."""
+        self.__unpack(decode_map(filepath, self.__settings.map_color_keys))
+
+    def __unpack(self, decoded: DecodedMap) -> None:
+        """Take over the tiles, spawn, goals and collision geometry of a decoded map."""
+        self.__tile_grid, self.__player_spawn_pos, self.__goals, self.__collision_geometry = decoded
 
     def __build_map(self) -> None:
-        """Build the map from the simple game map."""
+        """Set up the map around the player, chunks are only built once the camera gets near them."""
         surface_width, surface_height = self.__display.internal_surface.get_size()
+        self.__settings.assets.resolution = (surface_width, surface_height)
 
-        # Calculate square tile size that fits in screen
-        tile_size = min(
-            surface_width / (map_columns := len(self.__simple_game_map[0])),
-            surface_height / (map_rows := len(self.__simple_game_map))
+        # Square tile size that fits the map on screen, unless that would be too small to play
+        tile_size = max(
+            min(
+                surface_width / (map_columns := self.__tile_grid.width),
+                surface_height / (map_rows := self.__tile_grid.height)
+            ),
+            self.__settings.min_tile_size
         )
 
-        # Calculate offsets to center the map
-        offset_x = (surface_width - tile_size * map_columns) / 2
-        offset_y = (surface_height - tile_size * map_rows) / 2
-
-        for y, row in enumerate(self.__simple_game_map):
-            for x, cell in enumerate(row):
-                if cell is not None:
-                    self.__map_objects.append(map_objects.Brick(
-                        settings=self.__settings,
-                        type_=cell,
-                        topleft=(offset_x + x * tile_size, offset_y + y * tile_size),
-                        size=(round(tile_size), round(tile_size))
-                    ))
-
-        self.__collidable_objects = pygame.sprite.Group(self.__map_objects)
+        # Center the map along the axes it does not fill
+        offset_x = max((surface_width - tile_size * map_columns) / 2, 0)
+        offset_y = max((surface_height - tile_size * map_rows) / 2, 0)
+
+        self.__tile_size: float = tile_size
+        self.__offset: tuple[float, float] = (offset_x, offset_y)
+
+        # Tile ids the player is swept against
+        layers, solid_mask = self.__settings.map_collision_layers, self.__settings.player_solid_mask
+        self.__solid_ids = frozenset(
+            id_ for id_, type_ in enumerate(self.__tile_grid.types)
+            if type_ is not None and layers.get(type_, 0) & solid_mask
+        )
+
+        # One shared surface per tile type, indexed by tile id
+        tile_pixels = round(tile_size)
+        self.__tile_surfaces: list[pygame.Surface | None] = [
+            None if type_ is None else self.__settings.assets.get(type_, (tile_pixels, tile_pixels))
+            for type_ in self.__tile_grid.types
+        ]
+
+        self.__camera = Camera((surface_width, surface_height), self.__tile_rect(0, 0, map_columns, map_rows))
+        self.__rendered_offset: tuple[int, int] | None = None
+
+        self.__map_objects: list[map_objects.Brick] = []
+        self.__collidable_objects = pygame.sprite.Group()
+        self.__chunks: dict[tuple[int, int], MapChunk] = {}
+
+        # One cell per tile, so a query only looks at the rects under the given one
+        self.__spatial_index = SpatialHash(tile_size, origin=self.__offset)
+        self.__split_collision_geometry()
+
+        self.__spawn_player()
+        self.__update_view()
+
+    def __split_collision_geometry(self) -> None:
+        """Cut the merged tile rects along the chunk borders, so each chunk owns the pieces inside it."""
+        size = self.__settings.chunk_size
+
+        # Memory-mapped maps merge the geometry of each chunk when it is built instead
+        self.__chunk_geometry: dict[tuple[int, int], list[tile_rect]] | None = None
+        if self.__collision_geometry is None:
+            return
+
+        self.__chunk_geometry = {}
+        for x, y, width, height, type_ in self.__collision_geometry:
+            for chunk_y in range(y // size, (y + height - 1) // size + 1):
+                for chunk_x in range(x // size, (x + width - 1) // size + 1):
+                    left, top = max(x, chunk_x * size), max(y, chunk_y * size)
+                    right, bottom = min(x + width, (chunk_x + 1) * size), min(y + height, (chunk_y + 1) * size)
+                    self.__chunk_geometry.setdefault((chunk_x, chunk_y), []).append((left, top, right - left, bottom - top, type_))
+
+    def __spawn_player(self) -> None:
+        """Create a fresh player on the spawn tile."""
+        offset_x, offset_y = self.__offset
         self.__player = Player(
             settings=self.__settings,
-            topleft=(offset_x + self.__player_spawn_pos[0] * tile_size, offset_y + self.__player_spawn_pos[1] * tile_size),
-            size=(round(tile_size), round(tile_size))
+            topleft=(offset_x + self.__player_spawn_pos[0] * self.__tile_size, offset_y + self.__player_spawn_pos[1] * self.__tile_size),
+            size=(round(self.__tile_size), round(self.__tile_size))
         )
 
+    def __tile_rect(self, x: int, y: int, width: int, height: int) -> pygame.Rect:
+        """Pixel rect of a block of tiles, truncated the same way the tiles are so both line up to the pixel."""
+        offset_x, offset_y = self.__offset
+        tile_size, tile_pixels = self.__tile_size, round(self.__tile_size)
+
+        left, top = int(offset_x + x * tile_size), int(offset_y + y * tile_size)
+        right = int(offset_x + (x + width - 1) * tile_size) + tile_pixels
+        bottom = int(offset_y + (y + height - 1) * tile_size) + tile_pixels
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def __chunks_around(self, rect: pygame.Rect, margin: int) -> list[tuple[int, int]]:
+        """Chunks overlapping a pixel rect, grown by a margin of chunks and clipped to the map."""
+        offset_x, offset_y = self.__offset
+        size = self.__settings.chunk_size
+        chunk_pixels = size * self.__tile_size
+
+        first_x = max(floor((rect.left - offset_x) / chunk_pixels) - margin, 0)
+        first_y = max(floor((rect.top - offset_y) / chunk_pixels) - margin, 0)
+        last_x = min(floor((rect.right - 1 - offset_x) / chunk_pixels) + margin, -(-self.__tile_grid.width // size) - 1)
+        last_y = min(floor((rect.bottom - 1 - offset_y) / chunk_pixels) + margin, -(-self.__tile_grid.height // size) - 1)
+
+        return [(x, y) for y in range(first_y, last_y + 1) for x in range(first_x, last_x + 1)]
+
+    def __build_chunk(self, position: tuple[int, int]) -> None:
+        """Draw the tiles of a chunk straight from the grid, and add its collision rects and bricks."""
+        size = self.__settings.chunk_size
+        first_x, first_y = position[0] * size, position[1] * size
+        region = self.__tile_grid.region(first_x, first_y, size, size)
+        rect = self.__tile_rect(first_x, first_y, region.width, region.height)
+
+        offset_x, offset_y = self.__offset
+        tile_size, tile_pixels = self.__tile_size, round(self.__tile_size)
+
+        # Chunks without a single tile have nothing to draw
+        surface: pygame.Surface | None = None
+        if region.tiles.count(0) != region.width * region.height:
+            surfaces, width = self.__tile_surfaces, region.width
+
+            # Pixel positions are truncated the same way a Rect would
+            surface = pygame.Surface(rect.size, pygame.SRCALPHA)
+            surface.blits(
+                [
+                    (
+                        surfaces[id_],
+                        (
+                            int(offset_x + (first_x + index % width) * tile_size) - rect.x,
+                            int(offset_y + (first_y + index // width) * tile_size) - rect.y
+                        )
+                    )
+                    for index, id_ in enumerate(region.tiles) if id_
+                ],
+                doreturn=False
+            )
+
+        if self.__chunk_geometry is not None:
+            geometry = self.__chunk_geometry.get(position, [])
+        else:
+            geometry = [(first_x + x, first_y + y, width, height, type_) for x, y, width, height, type_ in build_collision_geometry(region)]
+
+        layers = self.__settings.map_collision_layers
+        collision_rects = [
+            CollisionRect(type_, self.__tile_rect(x, y, width, height), layers.get(type_, 0))
+            for x, y, width, height, type_ in geometry
+        ]
+        for collision_rect in collision_rects:
+            self.__spatial_index.insert(collision_rect)
+
+        # Plain tiles are only pixels in the chunk surface, only tiles with behavior get an object
+        bricks = [
+            map_objects.Brick(
+                settings=self.__settings,
+                type_=type_,
+                topleft=(offset_x + (first_x + x) * tile_size, offset_y + (first_y + y) * tile_size),
+                size=(tile_pixels, tile_pixels)
+            )
+            for type_ in self.__settings.map_behavior_types
+            for x, y in region.find(type_)
+        ]
+        self.__map_objects.extend(bricks)
+        self.__collidable_objects.add(bricks)
+
+        self.__chunks[position] = MapChunk(position, rect, surface, collision_rects, bricks)
+
+    def __evict_chunk(self, position: tuple[int, int]) -> None:
+        """Drop a chunk along with its collision rects and bricks."""
+        chunk = self.__chunks.pop(position)
+        for collision_rect in chunk.collision_rects:
+            self.__spatial_index.remove(collision_rect)
+
+        if chunk.bricks:
+            evicted = set(chunk.bricks)
+            self.__map_objects = [brick for brick in self.__map_objects if brick not in evicted]
+            self.__collidable_objects.remove(chunk.bricks)
+
+    def __update_view(self) -> None:
+        """Follow the player and stream the chunks around the viewport in and out."""
+        self.__camera.follow(self.__player.rect)
+        viewport = self.__camera.viewport
+
+        for position in self.__chunks_around(viewport, self.__settings.chunk_load_margin):
+            if position not in self.__chunks:
+                self.__build_chunk(position)
+
+        # Evicting further out than chunks are built keeps them from thrashing at a border
+        kept = set(self.__chunks_around(viewport, self.__settings.chunk_evict_margin))
+        for position in [position for position in self.__chunks if position not in kept]:
+            self.__evict_chunk(position)
+
     '''FUNCTIONS'''
 
     def render(self, display: Display) -> None:
-        """Render the map."""
-        for brick in self.__map_objects:
-            brick.render(display)
-        self.__player.render(display)
+        """Render the chunks in view and the player, relative to the camera."""
+        self.__update_view()
+        offset_x, offset_y = offset = self.__camera.offset
+        viewport = self.__camera.viewport
+
+        display.queue_blits([
+            (chunk.surface, (chunk.rect.x - offset_x, chunk.rect.y - offset_y))
+            for chunk in self.__chunks.values()
+            if chunk.surface is not None and chunk.rect.colliderect(viewport)
+        ])
+        self.__player.render(display, offset=offset)
+
+        self.__rendered_offset = offset
+
+    def reset(self) -> None:
+        """Put the map back the way it was built, with the player on its spawn."""
+        self.__spawn_player()
+        self.__update_view()
+
+    def dirty_rects(self) -> list[pygame.Rect]:
+        """Only the player moves, unless the camera moved along and the whole view changed."""
+        self.__update_view()
+        if self.__rendered_offset != self.__camera.offset:
+            return [pygame.Rect((0, 0), self.__camera.viewport.size)]
+        return self.__player.dirty_rects(self.__camera.offset)
+
+    def query(self, rect: pygame.Rect) -> list[CollisionRect]:
+        """Return the collision rects overlapping the given rect, building any chunk it reaches into."""
+        for position in self.__chunks_around(rect, 0):
+            if position not in self.__chunks:
+                self.__build_chunk(position)
+        return self.__spatial_index.query(rect)
+
+    def contacts(
+        self,
+        rects: Sequence[pygame.Rect],
+        mask: int = -1
+    ) -> list[dict[str, list[CollisionRect]]]:
+        """The collision rects on the mask's layers touching each rect, grouped by tile type, from a single query."""
+        area = rects[0].unionall(rects[1:])
+        for position in self.__chunks_around(area, 0):
+            if position not in self.__chunks:
+                self.__build_chunk(position)
+
+        grouped: list[dict[str, list[CollisionRect]]] = [{} for _ in rects]
+        for candidate in self.__spatial_index.query(area):
+            if not candidate.layer & mask:
+                continue
+            for contacts, rect in zip(grouped, rects):
+                if candidate.rect.colliderect(rect):
+                    contacts.setdefault(candidate.type, []).append(candidate)
+
+        return grouped
+
+    def move(
+        self,
+        topleft: tuple[float, float],
+        size: tuple[int, int],
+        motion: tuple[float, float]
+    ) -> tuple[tuple[float, float], list[Contact]]:
+        """Move a box of pixels through the tile grid, stopping and sliding at solid tiles.
+
+        Returns its new top left in pixels, and the contacts along the way in tile coordinates.
+        """
+        offset_x, offset_y = self.__offset
+        tile_size = self.__tile_size
+
+        box = ((topleft[0] - offset_x) / tile_size, (topleft[1] - offset_y) / tile_size, size[0] / tile_size, size[1] / tile_size)
+        (x, y), contacts = move(
+            self.__tile_grid, box, (motion[0] / tile_size, motion[1] / tile_size),
+            self.__solid_ids, self.__settings.map_edge_type,
+            tolerance=self.__settings.contact_tolerance / tile_size
+        )
+
+        return (offset_x + x * tile_size, offset_y + y * tile_size), contacts
+
+    def close(self) -> None:
+        """Release the tile grid, for a memory-mapped map its file. The map can not be used afterwards."""
+        self.__tile_grid.close()
 
     def debug(self, display: Display) -> None:
         """Render the debug information of the map."""
+        offset = self.__camera.offset
         for brick in self.__map_objects:
-            brick.debug(display)
-        self.__player.debug(display)
+            brick.debug(display, offset)
+        for collision_rect in self.collision_rects:
+            pygame.draw.rect(display.internal_surface, (255, 0, 255), self.__camera.to_screen(collision_rect.rect), 1)
+        self.__player.debug(display, offset)
 
     '''GETTERS'''
     @property
@@ -125,4 +389,87 @@ class Map(Renderable):
     @property
     def map_objects(self) -> list[map_objects.Brick]: return self.__map_objects
     @property
-    def collidable_objects(self) -> pygame.sprite.Group: return self.__collidable_objects
\ No newline at end of file
+    def collidable_objects(self) -> pygame.sprite.Group: return self.__collidable_objects
+    @property
+    def tile_grid(self) -> TileGrid: return self.__tile_grid
+    @property
+    def goals(self) -> list[tuple[int, int]]: return self.__goals
+    @property
+    def collision_rects(self) -> list[CollisionRect]: return [rect for chunk in self.__chunks.values() for rect in chunk.collision_rects]
+    @property
+    def collision_geometry(self) -> list[tile_rect] | None: return self.__collision_geometry
+    @property
+    def chunks(self) -> dict[tuple[int, int], MapChunk]: return self.__chunks
+    @property
+    def camera(self) -> Camera: return self.__camera
+    @property
+    def tile_size(self) -> float: return self.__tile_size
+    @property
+    def offset(self) -> tuple[float, float]: return self.__offset
+
+
+class MapCache:
+    """Keeps built maps keyed by (map path, display resolution), evicting the least recently used."""
+    __slots__ = (
+        '__settings',
+        '__max_entries',
+        '__maps'
+    )
+
+    def __init__(
+        self,
+        settings: Settings,
+        max_entries: int = 4
+    ) -> None:
+        self.__settings = settings
+        self.__max_entries = max_entries
+        self.__maps: OrderedDict[tuple[PathLike, tuple[int, int]], Map] = OrderedDict()
+
+    '''FUNCTIONS'''
+
+    def get(
+        self,
+        filepath: PathLike,
+        display: Display,
+        decoded: DecodedMap | None = None
+    ) -> Map:
+        """Return the map for a path, reset to its spawn if it was built before."""
+        key = (filepath, display.internal_surface.get_size())
+        if (map_ := self.__maps.get(key)) is not None:
+            self.__maps.move_to_end(key)
+            map_.reset()
+            return map_
+
+        map_ = Map(self.__settings, filepath=filepath, display=display, decoded=decoded)
+        self.__maps[key] = map_
+        self.__evict()
+
+        return map_
+
+    def __evict(self) -> None:
+        """Close and drop the least recently used maps until there are no more than max_entries."""
+        while len(self.__maps) > self.__max_entries:
+            self.__maps.popitem(last=False)[1].close()
+
+    def invalidate(self, filepath: PathLike | None = None) -> None:
+        """Drop the built maps of one path, or every map."""
+        for key in [key for key in self.__maps if filepath is None or key[0] == filepath]:
+            del self.__maps[key]
+
+    '''GETTERS'''
+
+    @property
+    def max_entries(self) -> int: return self.__max_entries
+
+    @max_entries.setter
+    def max_entries(self, max_entries: int) -> None:
+        self.__max_entries = max_entries
+        self.__evict()
+
+    '''DUNDERS'''
+
+    def __len__(self) -> int:
+        return len(self.__maps)
+
+    def __contains__(self, filepath: PathLike) -> bool:
+        return any(key[0] == filepath for key in self.__maps)
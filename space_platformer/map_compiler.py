@@ -0,0 +1,46 @@
+# map_compiler.py
+"""
+Compiles the map images listed in Settings.maps ahead of time.
+
+    python space_platformer/map_compiler.py
+    python space_platformer/map_compiler.py --force Test_Map_1
+    python space_platformer/map_compiler.py --raw
+
+Run from the repository root, like the game itself. The game loads a compiled
+map instead of its image whenever the compiled file is at least as new and was
+made with the same color keys.
+With --raw a memory-mapped tile file is written instead, which the game opens
+without decoding anything and reads one chunk at a time, for very large maps.
+"""
+import argparse
+import sys
+
+from settings import Settings
+from map_format import compile_map, compiled_path, convert_map, is_current, raw_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compile map images into the binary map format.")
+    parser.add_argument('names', nargs='*', help="map names from Settings.maps, all of them if none are given")
+    parser.add_argument('--force', action='store_true', help="compile even when the compiled file is up to date")
+    parser.add_argument('--raw', action='store_true', help="write memory-mapped raw tile files instead of compiled maps")
+    args = parser.parse_args()
+
+    settings = Settings(headless=True, run=False)
+
+    if unknown := [name for name in args.names if name not in settings.maps]:
+        parser.error(f"unknown map(s): {', '.join(unknown)}")
+
+    for name in args.names or settings.maps:
+        filepath = settings.maps[name]
+        target = raw_path(filepath) if args.raw else compiled_path(filepath)
+        if not args.force and is_current(target, filepath, settings.map_color_keys):
+            print(f"{name}: up to date", file=sys.stderr)
+            continue
+
+        (convert_map if args.raw else compile_map)(filepath, settings.map_color_keys)
+        print(f"{name}: {filepath} -> {target}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+# map_format.py
+
+import pygame
+
+import os
+import struct
+import zlib
+from os import PathLike
+from typing import BinaryIO, NamedTuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from tile_grid import MappedTileGrid, TileGrid
+
+
+type tile_rect = tuple[int, int, int, int, str]  # x, y, width, height in tiles, and the tile type
+
+
+class DecodedMap(NamedTuple):
+    """Everything a map needs before it is built, in tile coordinates.
+
+    Memory-mapped maps carry no collision geometry, it is merged per chunk as chunks are built.
+    """
+    tile_grid: TileGrid
+    player_spawn_pos: tuple[int, int] | None
+    goals: list[tuple[int, int]]
+    collision_geometry: list[tile_rect] | None
+
+
+# Compiled maps sit next to their image with this extension
+COMPILED_EXTENSION = ".spmap"
+
+_MAGIC = b"SPMP"
+_VERSION = 3
+
+# magic, version, color key hash, width, height, spawn x, spawn y (-1 without a spawn)
+_HEADER = struct.Struct("<4sHIIIii")
+_COUNT = struct.Struct("<I")
+_GOAL = struct.Struct("<II")
+_RECT = struct.Struct("<IIIIB")
+
+# Raw tile files also sit next to their image, and are memory-mapped instead of read
+RAW_EXTENSION = ".sptiles"
+
+_RAW_MAGIC = b"SPTL"
+_RAW_VERSION = 2
+
+# The tiles come first so the map starts at offset 0, which every platform can map.
+# The type table and goals follow them, then this footer:
+# width, height, spawn x, spawn y (-1 without a spawn), color key hash, magic, version
+_RAW_FOOTER = struct.Struct("<IIiiI4sH")
+
+
+def decode_map(
+    filepath: PathLike,
+    color_keys: dict[tuple[int, int, int, int], str]
+) -> DecodedMap:
+    """Decode a map, from its raw tile file or compiled file when either is at least as new as the image
+    and was made with the same color keys.
+
+    Needs no display, so it can run on a worker thread.
+    """
+    if is_current(raw := raw_path(filepath), filepath, color_keys):
+        return open_raw(raw)
+
+    if is_current(compiled := compiled_path(filepath), filepath, color_keys):
+        return read_compiled(compiled)
+
+    return decode_image(filepath, color_keys)
+
+
+def color_key_hash(color_keys: dict[tuple[int, int, int, int], str]) -> int:
+    """Hash of the color keys a map was decoded with, stored in its compiled and raw files."""
+    return zlib.crc32(repr(sorted(color_keys.items())).encode())
+
+
+def is_current(
+    target: PathLike,
+    filepath: PathLike,
+    color_keys: dict[tuple[int, int, int, int], str]
+) -> bool:
+    """Whether a compiled or raw file of a map image is at least as new as the image and was made with these color keys."""
+    if not os.path.exists(target) or (os.path.exists(filepath) and os.path.getmtime(target) < os.path.getmtime(filepath)):
+        return False
+
+    read_key_hash = _raw_key_hash if str(target).endswith(RAW_EXTENSION) else _compiled_key_hash
+    return read_key_hash(target) == color_key_hash(color_keys)
+
+
+def decode_image(
+    filepath: PathLike,
+    color_keys: dict[tuple[int, int, int, int], str]
+) -> DecodedMap:
+    """Classify every pixel of a map image into a tile type, and find the player spawn."""
+    try:
+        image: pygame.Surface = pygame.image.load(filepath)
+    except pygame.error as e:
+        raise RuntimeError(f"Failed to load map image: {e}") from e
+
+    # Straight RGBA bytes, colorkeyed pixels come out transparent like convert_alpha() makes them
+    width, height = image.get_size()
+    pixels = pygame.image.tobytes(image, "RGBA")
+
+    # Tile types in the order of the color keys, the player is not a tile
+    types = list(dict.fromkeys(type_ for type_ in color_keys.values() if type_ != "PLAYER"))
+
+    if numpy is not None:
+        tiles, player_spawn_pos = _decode_array(pixels, width, height, color_keys, types)
+    else:
+        tiles, player_spawn_pos = _decode_pixels(pixels, width, height, color_keys, types)
+    tile_grid = TileGrid(width, height, types, tiles)
+
+    # Place the player in the first empty space if not already placed
+    if player_spawn_pos is None and (index := tile_grid.tiles.find(0)) != -1:
+        player_spawn_pos = (index % width, index // width)
+
+    return DecodedMap(tile_grid, player_spawn_pos, tile_grid.find("GOAL"), build_collision_geometry(tile_grid))
+
+
+def _decode_array(
+    pixels: bytes,
+    width: int,
+    height: int,
+    color_keys: dict[tuple[int, int, int, int], str],
+    types: list[str]
+) -> tuple[bytes, tuple[int, int] | None]:
+    """Classify every pixel of the image at once with NumPy."""
+    rgba = numpy.frombuffer(pixels, dtype=numpy.uint8).reshape(height, width, 4)
+
+    # Same rounding as Color.normalize(), packed into a 4 bit RGBA code per pixel
+    bits = (rgba >= 128).astype(numpy.uint8)
+    codes = bits[..., 0] << 3 | bits[..., 1] << 2 | bits[..., 2] << 1 | bits[..., 3]
+
+    # Lookup table from code to tile id, 0 for unknown colors and the player
+    lookup = numpy.zeros(16, dtype=numpy.uint8)
+    for (r, g, b, a), type_ in color_keys.items():
+        if type_ != "PLAYER":
+            lookup[r << 3 | g << 2 | b << 1 | a] = types.index(type_) + 1
+
+    tiles = lookup[codes].tobytes()
+
+    # Last player pixel wins, like the per-pixel decoder
+    player_codes = [r << 3 | g << 2 | b << 1 | a for (r, g, b, a), type_ in color_keys.items() if type_ == "PLAYER"]
+    ys, xs = numpy.nonzero(numpy.isin(codes, player_codes))
+
+    return tiles, (int(xs[-1]), int(ys[-1])) if len(xs) else None
+
+
+def _decode_pixels(
+    pixels: bytes,
+    width: int,
+    height: int,
+    color_keys: dict[tuple[int, int, int, int], str],
+    types: list[str]
+) -> tuple[bytes, tuple[int, int] | None]:
+    """Classify the image pixel by pixel, used when NumPy is not installed."""
+    ids = {type_: i + 1 for i, type_ in enumerate(types)}
+    tiles = bytearray(width * height)
+    player_spawn_pos: tuple[int, int] | None = None
+
+    # Create a simple game map based on the image colors
+    for y in range(height):
+        for x in range(width):
+            offset = (y * width + x) * 4
+            color = tuple(round(channel / 255) for channel in pixels[offset:offset + 4])
+            if (type_ := color_keys.get(color, None)) != "PLAYER":
+                tiles[y * width + x] = ids.get(type_, 0)
+            else:
+                player_spawn_pos = (x, y)
+
+    return bytes(tiles), player_spawn_pos
+
+
+def build_collision_geometry(tile_grid: TileGrid) -> list[tile_rect]:
+    """Greedily merge blocks of same-type tiles into as few rects as possible.
+
+    From each uncovered tile, in row-major order, the rect grows right as far as
+    the type continues, then down for as long as the whole span below matches.
+    """
+    width, height = tile_grid.size
+    tiles = tile_grid.tiles
+    covered = bytearray(width * height)
+
+    rects: list[tile_rect] = []
+    for index in range(width * height):
+        if not (id_ := tiles[index]) or covered[index]:
+            continue
+        x, y = index % width, index // width
+
+        # Grow right
+        run = 1
+        while x + run < width and tiles[index + run] == id_ and not covered[index + run]:
+            run += 1
+
+        # Grow down while the whole span matches
+        span = bytes([id_]) * run
+        rows = 1
+        while y + rows < height:
+            start = index + rows * width
+            if tiles[start:start + run] != span or any(covered[start:start + run]):
+                break
+            rows += 1
+
+        for row in range(rows):
+            start = index + row * width
+            covered[start:start + run] = b"\x01" * run
+
+        rects.append((x, y, run, rows, tile_grid.types[id_]))
+
+    return rects
+
+
+def compiled_path(filepath: PathLike) -> str:
+    """Where the compiled file of a map image lives."""
+    return os.path.splitext(filepath)[0] + COMPILED_EXTENSION
+
+
+def compile_map(
+    filepath: PathLike,
+    color_keys: dict[tuple[int, int, int, int], str]
+) -> str:
+    """Decode a map image and write its compiled file next to it, returns the compiled path."""
+    decoded = decode_image(filepath, color_keys)
+    with open(compiled := compiled_path(filepath), 'wb') as file:
+        file.write(encode(decoded, color_key_hash(color_keys)))
+
+    return compiled
+
+
+def _compiled_key_hash(filepath: PathLike) -> int | None:
+    """The color key hash in a compiled map's header, None if it is not a current compiled map."""
+    try:
+        with open(filepath, 'rb') as file:
+            magic, version, key_hash, *_ = _HEADER.unpack(file.read(_HEADER.size))
+    except (OSError, struct.error):
+        return None
+
+    return key_hash if magic == _MAGIC and version == _VERSION else None
+
+
+def encode(decoded: DecodedMap, key_hash: int = 0) -> bytes:
+    """Pack a decoded map into the compiled format, with the hash of the color keys it was decoded with."""
+    tile_grid = decoded.tile_grid
+
+    # Tile id 0 is the empty tile, the others index the type table
+    types = tile_grid.types[1:]
+
+    spawn_x, spawn_y = decoded.player_spawn_pos if decoded.player_spawn_pos is not None else (-1, -1)
+    chunks: list[bytes] = [_HEADER.pack(_MAGIC, _VERSION, key_hash, tile_grid.width, tile_grid.height, spawn_x, spawn_y), bytes([len(types)])]
+    for type_ in types:
+        name = type_.encode()
+        chunks.append(bytes([len(name)]) + name)
+
+    chunks.append(bytes(tile_grid.tiles))
+
+    chunks.append(_COUNT.pack(len(decoded.goals)))
+    chunks.extend(_GOAL.pack(*goal) for goal in decoded.goals)
+
+    chunks.append(_COUNT.pack(len(decoded.collision_geometry)))
+    chunks.extend(_RECT.pack(x, y, w, h, tile_grid.id_of(type_)) for x, y, w, h, type_ in decoded.collision_geometry)
+
+    return b"".join(chunks)
+
+
+def read_compiled(filepath: PathLike) -> DecodedMap:
+    """Load a compiled map with a single read."""
+    with open(filepath, 'rb') as file:
+        data = file.read()
+
+    try:
+        return decode(data)
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise RuntimeError(f"Failed to read compiled map {filepath}: {e}") from e
+
+
+def decode(data: bytes) -> DecodedMap:
+    """Unpack a compiled map."""
+    magic, version, _, width, height, spawn_x, spawn_y = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION:
+        raise RuntimeError(f"Not a version {_VERSION} compiled map")
+    offset = _HEADER.size
+
+    types: list[str | None] = [None]
+    for _ in range(data[offset]):
+        length = data[offset + 1]
+        types.append(data[offset + 2:offset + 2 + length].decode())
+        offset += 1 + length
+    offset += 1
+
+    tile_grid = TileGrid(width, height, types[1:], data[offset:offset + width * height])
+    offset += width * height
+
+    (count,) = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    goals = list(_GOAL.iter_unpack(data[offset:offset + count * _GOAL.size]))
+    offset += count * _GOAL.size
+
+    (count,) = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    collision_geometry = [(x, y, w, h, types[tile]) for x, y, w, h, tile in _RECT.iter_unpack(data[offset:offset + count * _RECT.size])]
+
+    return DecodedMap(tile_grid, (spawn_x, spawn_y) if spawn_x >= 0 else None, goals, collision_geometry)
+
+
+def raw_path(filepath: PathLike) -> str:
+    """Where the raw tile file of a map image lives."""
+    return os.path.splitext(filepath)[0] + RAW_EXTENSION
+
+
+def convert_map(
+    filepath: PathLike,
+    color_keys: dict[tuple[int, int, int, int], str]
+) -> str:
+    """Decode a map image and write its raw tile file next to it, returns the raw path."""
+    decoded = decode_image(filepath, color_keys)
+    with open(raw := raw_path(filepath), 'wb') as file:
+        write_raw(decoded, file, color_key_hash(color_keys))
+
+    return raw
+
+
+def _raw_key_hash(filepath: PathLike) -> int | None:
+    """The color key hash in a raw tile file's footer, None if it is not a current raw tile file."""
+    try:
+        with open(filepath, 'rb') as file:
+            file.seek(-_RAW_FOOTER.size, os.SEEK_END)
+            *_, key_hash, magic, version = _RAW_FOOTER.unpack(file.read(_RAW_FOOTER.size))
+    except (OSError, struct.error):
+        return None
+
+    return key_hash if magic == _RAW_MAGIC and version == _RAW_VERSION else None
+
+
+def write_raw(decoded: DecodedMap, file: BinaryIO, key_hash: int = 0) -> None:
+    """Write a decoded map in the raw tile format, the tiles are written straight from the grid."""
+    tile_grid = decoded.tile_grid
+    types = tile_grid.types[1:]
+
+    file.write(tile_grid.tiles)
+
+    file.write(bytes([len(types)]))
+    for type_ in types:
+        name = type_.encode()
+        file.write(bytes([len(name)]) + name)
+
+    file.write(_COUNT.pack(len(decoded.goals)))
+    file.write(b"".join(_GOAL.pack(*goal) for goal in decoded.goals))
+
+    spawn_x, spawn_y = decoded.player_spawn_pos if decoded.player_spawn_pos is not None else (-1, -1)
+    file.write(_RAW_FOOTER.pack(tile_grid.width, tile_grid.height, spawn_x, spawn_y, key_hash, _RAW_MAGIC, _RAW_VERSION))
+
+
+def open_raw(filepath: PathLike) -> DecodedMap:
+    """Open a raw tile file, only its footer, type table and goals are read, the tiles are mapped."""
+    try:
+        with open(filepath, 'rb') as file:
+            file.seek(-_RAW_FOOTER.size, os.SEEK_END)
+            width, height, spawn_x, spawn_y, _, magic, version = _RAW_FOOTER.unpack(file.read(_RAW_FOOTER.size))
+            if magic != _RAW_MAGIC or version != _RAW_VERSION:
+                raise RuntimeError(f"Not a version {_RAW_VERSION} raw tile file")
+
+            # Everything between the tiles and the footer
+            file.seek(width * height)
+            data = file.read()[:-_RAW_FOOTER.size]
+
+        types: list[str] = []
+        offset = 1
+        for _ in range(data[0]):
+            length = data[offset]
+            types.append(data[offset + 1:offset + 1 + length].decode())
+            offset += 1 + length
+
+        (count,) = _COUNT.unpack_from(data, offset)
+        offset += _COUNT.size
+        goals = list(_GOAL.iter_unpack(data[offset:offset + count * _GOAL.size]))
+
+        tile_grid = MappedTileGrid(filepath, width, height, types)
+    except (OSError, ValueError, struct.error, IndexError, UnicodeDecodeError) as e:
+        raise RuntimeError(f"Failed to open raw tile file {filepath}: {e}") from e
+
+    return DecodedMap(tile_grid, (spawn_x, spawn_y) if spawn_x >= 0 else None, goals, None)
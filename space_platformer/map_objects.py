@@ -30,12 +30,8 @@ class Brick(pygame.sprite.Sprite, Renderable, Collidable):
 
         self.__settings: Settings = settings
 
-        try:
-            self.__surface = pygame.image.load(self.__settings.map_asset_keys[type_]).convert_alpha()
-            if size is not None:
-                self.__surface = pygame.transform.scale(self.__surface, size)
-        except pygame.error as e:
-            raise RuntimeError(f"Failed to load brick image: {e}") from e
+        # Shared with every other brick of this type and size
+        self.__surface = self.__settings.assets.get(type_, size)
 
         self.__type = type_
         self.__debug_color = debug_color
@@ -54,23 +50,58 @@ class Brick(pygame.sprite.Sprite, Renderable, Collidable):
         else:
             self.__rect.topleft = pos
 
-        display.blit(self.__surface, self.__rect.topleft)
+        display.queue_blit(self.__surface, self.__rect.topleft)
 
-    def debug(self, display: Display) -> None:
-        """Render the debug color of the brick."""
+    def debug(self, display: Display, offset: tuple[int, int] = (0, 0)) -> None:
+        """Render the debug color of the brick, less the camera offset."""
         if self.__debug_color is not None:
-            pygame.draw.rect(display.internal_surface, self.__debug_color, self.__rect, 1)
+            rect = self.__rect.move(-offset[0], -offset[1])
+            pygame.draw.rect(display.internal_surface, self.__debug_color, rect, 1)
 
             # Debug information
-            font = display.debug_font
-            text_surface = font.render(self.__type, False, (0, 0, 0))
+            text_surface = display.render_text(self.__type, display.debug_font)
             text_width, text_height = text_surface.get_size()               # Centered text
-            text_offset_x, text_offset_y = (self.__rect.width - text_width) / 2, (self.__rect.height - text_height) / 2
-            display.blit(text_surface, (self.__rect.x + text_offset_x, self.__rect.y + text_offset_y))
+            text_offset_x, text_offset_y = (rect.width - text_width) / 2, (rect.height - text_height) / 2
+            display.blit(text_surface, (rect.x + text_offset_x, rect.y + text_offset_y))
 
     '''GETTERS'''
 
     @property
     def type(self) -> str: return self.__type
     @property
-    def rect(self) -> pygame.Rect: return self.__rect
\ No newline at end of file
+    def rect(self) -> pygame.Rect: return self.__rect
+    @property
+    def surface(self) -> pygame.Surface: return self.__surface
+
+
+class CollisionRect(Collidable):
+    """Solid area made of one or more same-type tiles, used for collision instead of the bricks."""
+    __slots__ = (
+        '__type',
+        '__rect',
+        '__layer'
+    )
+
+    def __init__(
+        self,
+        type_: str,
+        rect: pygame.Rect,
+        layer: int = 0
+    ) -> None:
+        self.__type = type_
+        self.__rect = pygame.Rect(rect)
+        self.__layer = layer  # Collision layer bit, from Settings.map_collision_layers
+
+    '''GETTERS'''
+
+    @property
+    def type(self) -> str: return self.__type
+    @property
+    def rect(self) -> pygame.Rect: return self.__rect
+    @property
+    def layer(self) -> int: return self.__layer
+
+    '''DUNDERS'''
+
+    def __repr__(self) -> str:
+        return f"CollisionRect({self.__type}, {tuple(self.__rect)})"
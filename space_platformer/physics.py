@@ -0,0 +1,173 @@
+# physics.py
+
+from math import ceil, floor, inf
+from typing import NamedTuple
+
+from tile_grid import TileGrid
+
+
+# Slack, in tiles, for boxes that end a move exactly against a tile, floats do not land there exactly
+_TOLERANCE = 1e-6
+
+
+class Contact(NamedTuple):
+    """A moving box touching a tile, in tile coordinates."""
+    time: float                 # Fraction of the sweep done when the box reached the tile
+    normal: tuple[int, int]     # Points out of the tile, against the motion, (0, 0) for tiles the box passes through
+    cell: tuple[int, int]
+    type: str
+
+
+def sweep(
+    tile_grid: TileGrid,
+    box: tuple[float, float, float, float],
+    motion: tuple[float, float],
+    solid_ids: frozenset[int],
+    edge_type: str | None = None,
+    tolerance: float = _TOLERANCE
+) -> tuple[Contact | None, list[Contact]]:
+    """Sweep a box along a motion, returns the first solid tile it hits and the other tiles it touches before that.
+
+    Only the cells along the path are looked at, one tile of motion at a time, so the
+    cost follows the distance moved and nothing is skipped however far the box goes.
+    Cells outside the grid are solid tiles of the edge type, or empty without one.
+    The tolerance is how far, in tiles, a box may start inside a solid tile and still be stopped by it.
+    """
+    x, y, width, height = box
+    dx, dy = motion
+    steps = max(ceil(max(abs(dx), abs(dy))), 1)
+
+    seen: set[tuple[int, int]] = set()
+    hit: Contact | None = None
+    touched: list[Contact] = []
+
+    for step in range(steps):
+        start, end = step / steps, (step + 1) / steps
+
+        # Cells under the box anywhere along this step
+        left = min(x + dx * start, x + dx * end)
+        top = min(y + dy * start, y + dy * end)
+        right = max(x + dx * start, x + dx * end) + width
+        bottom = max(y + dy * start, y + dy * end) + height
+
+        for cell_y in _cells_between(top, bottom, dy):
+            for cell_x in _cells_between(left, right, dx):
+                if (cell := (cell_x, cell_y)) in seen:
+                    continue
+                seen.add(cell)
+
+                if 0 <= cell_x < tile_grid.width and 0 <= cell_y < tile_grid.height:
+                    if not (id_ := tile_grid.id_at(cell_x, cell_y)):
+                        continue
+                    solid, type_ = id_ in solid_ids, tile_grid.types[id_]
+                elif edge_type is not None:
+                    solid, type_ = True, edge_type
+                else:
+                    continue
+
+                if (entry := _entry(box, motion, cell)) is None:
+                    continue
+                time, normal = entry
+
+                # Passing through a tile needs more than ending flush against it
+                if not solid:
+                    if time < 1:
+                        touched.append(Contact(max(time, 0.0), (0, 0), cell, type_))
+                # Solid tiles the box already overlaps do not hold it, so it can get out of them.
+                # The overlap is measured along the face, so the slack is the same at any speed
+                elif -time * abs(dx if normal[0] else dy) <= tolerance and (hit is None or time < hit.time):
+                    hit = Contact(max(time, 0.0), normal, cell, type_)
+
+        # Cells not seen yet can only be reached after this step
+        if hit is not None and hit.time <= end:
+            break
+
+    if hit is not None:
+        touched = [contact for contact in touched if contact.time <= hit.time]
+    return hit, sorted(touched)
+
+
+def move(
+    tile_grid: TileGrid,
+    box: tuple[float, float, float, float],
+    motion: tuple[float, float],
+    solid_ids: frozenset[int],
+    edge_type: str | None = None,
+    max_slides: int = 3,
+    tolerance: float = _TOLERANCE
+) -> tuple[tuple[float, float], list[Contact]]:
+    """Move a box as far as the solid tiles let it, sliding along the ones it hits.
+
+    Returns the new top left of the box and every contact on the way, in order.
+    """
+    x, y, width, height = box
+    dx, dy = motion
+
+    contacts: dict[tuple[int, int], Contact] = {}
+    for _ in range(max_slides):
+        if dx == 0 and dy == 0:
+            break
+
+        hit, touched = sweep(tile_grid, (x, y, width, height), (dx, dy), solid_ids, edge_type, tolerance)
+        for contact in touched:
+            contacts.setdefault(contact.cell, contact)
+
+        time = 1.0 if hit is None else hit.time
+        x, y = x + dx * time, y + dy * time
+        if hit is None:
+            break
+        contacts[hit.cell] = hit
+
+        # What is left of the motion, less the part going into the tile
+        dx = 0.0 if hit.normal[0] else dx * (1 - time)
+        dy = 0.0 if hit.normal[1] else dy * (1 - time)
+
+    return (x, y), list(contacts.values())
+
+
+def _cells_between(low: float, high: float, direction: float) -> range:
+    """Cells a span covers along one axis, and the cell its leading edge only touches, so a box ending flush against a tile still hits it."""
+    if direction > 0:
+        return range(floor(low), floor(high) + 1)
+    if direction < 0:
+        return range(ceil(low) - 1, ceil(high))
+    return range(floor(low), ceil(high))
+
+
+def _entry(
+    box: tuple[float, float, float, float],
+    motion: tuple[float, float],
+    cell: tuple[int, int]
+) -> tuple[float, tuple[int, int]] | None:
+    """Time of impact and normal of a box sweeping into a unit cell, None if it never does during the motion."""
+    x, y, width, height = box
+    dx, dy = motion
+    cell_x, cell_y = cell
+
+    # When the box starts and stops overlapping the cell along each axis
+    if dx > 0:
+        entry_x, exit_x = (cell_x - (x + width)) / dx, (cell_x + 1 - x) / dx
+    elif dx < 0:
+        entry_x, exit_x = (cell_x + 1 - x) / dx, (cell_x - (x + width)) / dx
+    elif x < cell_x + 1 and x + width > cell_x:
+        entry_x, exit_x = -inf, inf
+    else:
+        return None
+
+    if dy > 0:
+        entry_y, exit_y = (cell_y - (y + height)) / dy, (cell_y + 1 - y) / dy
+    elif dy < 0:
+        entry_y, exit_y = (cell_y + 1 - y) / dy, (cell_y - (y + height)) / dy
+    elif y < cell_y + 1 and y + height > cell_y:
+        entry_y, exit_y = -inf, inf
+    else:
+        return None
+
+    entry, exit_ = max(entry_x, entry_y), min(exit_x, exit_y)
+    if entry >= exit_ or exit_ <= 0 or entry > 1:
+        return None
+
+    # The axis that started overlapping last is the face that was hit
+    if entry_x > entry_y:
+        return entry, (-1 if dx > 0 else 1, 0)
+    return entry, (0, -1 if dy > 0 else 1)
@@ -17,14 +17,16 @@ class Player(pygame.sprite.Sprite, Renderable, Collidable):
         '__main_rect',
         '__grounded_rect',
         '__grounded',
-        '__velocity'
+        '__velocity',
+        '__position',
+        '__rendered_rect'
     )
 
     __EFFECTS = {
-        "WALL" : lambda self: setattr(self, '__velocity', None),
+        "WALL" : lambda self, other: self.__block(other),
         # Alternative wall collision effect for debugging
-        # "WALL" : lambda self: self.__main_rect.update((random.randint(0, 300), random.randint(0, 300)), (self.__main_rect.width, self.__main_rect.height)),
-        "GOAL" : lambda self: setattr(self.__settings, 'gamestate', "menu")
+        # "WALL" : lambda self, other: self.__main_rect.update((random.randint(0, 300), random.randint(0, 300)), (self.__main_rect.width, self.__main_rect.height)),
+        "GOAL" : lambda self, other: setattr(self.__settings, 'gamestate', "menu")
     }
 
     def __init__(
@@ -38,63 +40,108 @@ class Player(pygame.sprite.Sprite, Renderable, Collidable):
 
         self.__settings: Settings = settings
 
-        try:
-            self.__surface = pygame.image.load(self.__settings.map_asset_keys["PLAYER"]).convert_alpha()
-            if size is not None:
-                self.__surface = pygame.transform.scale(self.__surface, size)
-        except pygame.error as e:
-            raise RuntimeError(f"Failed to load brick image: {e}") from e
+        self.__surface = self.__settings.assets.get("PLAYER", size)
 
         self.__grounded = False
+        self.__velocity: tuple[float, float] = (0.0, 0.0)  # Pixels per second
+        self.__position: tuple[float, float] = (float(topleft[0]), float(topleft[1]))  # Exact top left, the rect is whole pixels
         self.__debug_color = debug_color
         self.__main_rect = pygame.Rect(*topleft, *self.__surface.get_size())
+        self.__rendered_rect: pygame.Rect | None = None
         # self.__grounded_rect = pygame.Rect(
         #     *(x - self.__settings.jumpable_distance_threshold for x in topleft),
         #     *(x + 2 * self.__settings.jumpable_distance_threshold for x in (self.__surface.get_size()))
         # )
-        player_width, player_height = self.__surface.get_size()
+        # Thin strip under the feet, only what the player stands on touches it, not walls beside it or ceilings
         self.__grounded_rect = pygame.Rect(
-            topleft[0] - self.__settings.jumpable_distance_threshold * player_width,
-            topleft[1] - self.__settings.jumpable_distance_threshold * player_height,
-            player_width + 2 * self.__settings.jumpable_distance_threshold * player_width,
-            player_height + 2 * self.__settings.jumpable_distance_threshold * player_height
+            0, 0,
+            self.__main_rect.width, max(round(self.__settings.jumpable_distance_threshold * self.__main_rect.height), 1)
         )
+        self.__grounded_rect.midtop = self.__main_rect.midbottom
 
     '''FUNCTIONS'''
 
     def collide(self, other: Collidable) -> None:
-        """Called when the player collides with another object."""
-        self.__EFFECTS.get(other.type, lambda self: None)(self)
+        """Called when the player collides with another object, or a swept contact with a tile."""
+        self.__EFFECTS.get(other.type, lambda self, other: None)(self, other)
+
+    def step(
+            self,
+            dt: float,
+            walk: int = 0,
+            jump: bool = False
+        ) -> tuple[float, float]:
+        """Advance the velocity by one tick and return the motion it asks for, collision decides how much of it happens."""
+        # Speeds are set in tiles, the player is one tile tall
+        unit = self.__main_rect.height
+        velocity_x = walk * self.__settings.walk_speed * unit
+        velocity_y = min(self.__velocity[1] + self.__settings.gravity * unit * dt, self.__settings.max_fall_speed * unit)
+        if jump and self.__grounded:
+            velocity_y = -self.__settings.jump_speed * unit
+
+        self.__velocity = (velocity_x, velocity_y)
+
+        # Landing on something sets it again
+        self.__grounded = False
+        return velocity_x * dt, velocity_y * dt
+
+    def move_to(self, position: tuple[float, float]) -> None:
+        """Put the player at an exact position, the rects follow to the pixel."""
+        self.__position = position
+        self.__main_rect.topleft = (int(position[0]), int(position[1]))
+        self.__grounded_rect.midtop = self.__main_rect.midbottom
+
+    def __block(self, other: Collidable) -> None:
+        """Stop the motion into a solid contact, standing on it grounds the player."""
+        # Plain overlaps carry no direction to stop
+        if (normal := getattr(other, 'normal', None)) is None:
+            return
+
+        velocity_x, velocity_y = self.__velocity
+        self.__velocity = (0.0 if normal[0] else velocity_x, 0.0 if normal[1] else velocity_y)
+        if normal == (0, -1):
+            self.grounded = True
 
     def render(
             self,
             display: Display,
-            pos: tuple[int, int] | None = None
+            pos: tuple[int, int] | None = None,
+            offset: tuple[int, int] = (0, 0)
         ) -> None:
-        """Renders the given surface by blitting text surfaces at the specified position."""
+        """Renders the given surface by blitting text surfaces at the specified position, less the camera offset."""
         if pos is None:
             pos = self.__main_rect.topleft
         else:
             self.__main_rect.topleft = pos
 
-        display.blit(self.__surface, self.__main_rect.topleft)
+        self.__rendered_rect = self.__main_rect.move(-offset[0], -offset[1])
+        display.queue_blit(self.__surface, self.__rendered_rect.topleft)
+
+    def dirty_rects(self, offset: tuple[int, int] = (0, 0)) -> list[pygame.Rect]:
+        """The old and new screen position of the player if it moved since it was last rendered."""
+        screen_rect = self.__main_rect.move(-offset[0], -offset[1])
+        if self.__rendered_rect is None:
+            return [screen_rect]
+        if self.__rendered_rect != screen_rect:
+            return [self.__rendered_rect, screen_rect]
+        return []
 
-    def debug(self, display: Display) -> None:
+    def debug(self, display: Display, offset: tuple[int, int] = (0, 0)) -> None:
         """Render the debug color of the brick."""
         if self.__debug_color is not None:
-            pygame.draw.rect(display.internal_surface, self.__debug_color, self.__main_rect, 1)
-            pygame.draw.rect(display.internal_surface, self.__debug_color, self.__grounded_rect, 1)
+            main_rect = self.__main_rect.move(-offset[0], -offset[1])
+            pygame.draw.rect(display.internal_surface, self.__debug_color, main_rect, 1)
+            pygame.draw.rect(display.internal_surface, self.__debug_color, self.__grounded_rect.move(-offset[0], -offset[1]), 1)
 
             # Debug information
-            font = display.debug_font
             texts: list[pygame.Surface] = [
-                font.render(self.__class__.__name__, False, (0, 0, 0)),
-                font.render(str(self.__grounded), False, (0, 0, 0))
+                display.render_text(self.__class__.__name__, display.debug_font),
+                display.render_text(str(self.__grounded), display.debug_font)
             ]
             for i, text in enumerate(texts):
                 width, height = text.get_size()
-                text_offset_x, text_offset_y = (self.__main_rect.width - width) / 2, height * i
-                display.blit(text, (self.__main_rect.x + text_offset_x, self.__main_rect.y + text_offset_y))
+                text_offset_x, text_offset_y = (main_rect.width - width) / 2, height * i
+                display.blit(text, (main_rect.x + text_offset_x, main_rect.y + text_offset_y))
 
     @property
     def rect(self) -> pygame.Rect: return self.__main_rect
@@ -106,13 +153,18 @@ class Player(pygame.sprite.Sprite, Renderable, Collidable):
     def position(self) -> tuple[int, int]: return self.__main_rect.topleft
     @property
     def pos(self) -> tuple[int, int]: return self.__main_rect.topleft
+    @property
+    def exact_position(self) -> tuple[float, float]: return self.__position
+    @property
+    def velocity(self) -> tuple[float, float]: return self.__velocity
+    @property
+    def surface(self) -> pygame.Surface: return self.__surface
 
     @rect.setter
     def pos(self, pos: tuple[int, int]) -> None:
         self.__main_rect.topleft = pos
-        self.__grounded_rect.topleft = tuple(x * self.__settings.jumpable_distance_threshold for x in pos)
+        self.__grounded_rect.midtop = self.__main_rect.midbottom
     @grounded.setter
     def grounded(self, grounded: bool) -> None:
-        self.__grounded = grounded
-        if grounded:
-            self.__velocity = (0, 0)
\ No newline at end of file
+        # Only says the player may jump, the swept contacts are what stop it
+        self.__grounded = grounded
\ No newline at end of file
@@ -0,0 +1,96 @@
+# profiler.py
+
+from collections import deque
+from contextlib import contextmanager
+from math import ceil
+from time import perf_counter_ns
+from typing import Iterator
+
+
+class FrameProfiler:
+    """Times the phases of each frame and keeps a rolling window of the totals per frame."""
+    __slots__ = (
+        '__window',
+        '__samples',
+        '__current',
+        '__frame_start'
+    )
+
+    def __init__(self, window: int = 240) -> None:
+        self.__window = window
+
+        # Nanoseconds per frame, one deque per phase plus 'frame' for the whole frame
+        self.__samples: dict[str, deque[int]] = {}
+        self.__current: dict[str, int] = {}
+        self.__frame_start: int | None = None
+
+    '''FUNCTIONS'''
+
+    def begin_frame(self) -> None:
+        """Start timing a frame."""
+        self.__current = {}
+        self.__frame_start = perf_counter_ns()
+
+    def end_frame(self) -> None:
+        """Store the totals of the frame that just finished."""
+        if self.__frame_start is None:
+            return
+        self.__current['frame'] = perf_counter_ns() - self.__frame_start
+        self.__frame_start = None
+
+        # Phases that did not run this frame count as zero so every deque covers the same frames
+        for name in self.__samples.keys() | self.__current.keys():
+            if name not in self.__samples:
+                self.__samples[name] = deque(maxlen=self.__window)
+            self.__samples[name].append(self.__current.get(name, 0))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the body as part of a phase, repeated phases within a frame add up."""
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.__current[name] = self.__current.get(name, 0) + perf_counter_ns() - start
+
+    def stats(self, name: str) -> dict[str, float]:
+        """Mean, p95, p99 and max of a phase over the window, in milliseconds."""
+        if not (samples := sorted(self.__samples.get(name, ()))):
+            return {'mean': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+
+        def percentile(p: float) -> float:
+            return samples[max(ceil(p / 100 * len(samples)) - 1, 0)] / 1e6
+
+        return {
+            'mean': sum(samples) / len(samples) / 1e6,
+            'p95': percentile(95),
+            'p99': percentile(99),
+            'max': samples[-1] / 1e6
+        }
+
+    def histogram(self, name: str, bins: int = 16, limit_ms: float | None = None) -> list[int]:
+        """Count the frames of a phase in equal bins from 0 to limit_ms, the last bin takes everything above."""
+        if not (samples := self.__samples.get(name)):
+            return [0] * bins
+
+        limit = (max(samples) if limit_ms is None else limit_ms * 1e6) or 1
+        counts = [0] * bins
+        for sample in samples:
+            counts[min(int(sample / limit * bins), bins - 1)] += 1
+
+        return counts
+
+    def reset(self) -> None:
+        """Forget every sample."""
+        self.__samples.clear()
+        self.__current = {}
+        self.__frame_start = None
+
+    '''GETTERS'''
+
+    @property
+    def window(self) -> int: return self.__window
+    @property
+    def phases(self) -> list[str]: return list(self.__samples)
+    @property
+    def summary(self) -> dict[str, dict[str, float]]: return {name: self.stats(name) for name in self.__samples}
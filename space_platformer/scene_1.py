@@ -1,16 +1,19 @@
 # menu.py
-from typing import Any
 
+import config
 from settings import Settings
 
 from button import *
 from map import *
 
 
-class Scene():
+# Maps the scene shows, so the loader can start on them before the scene is entered
+MAP_NAMES: tuple[str, ...] = ("Test_Map_1",)
+
+
+class Scene(config.Scene):
     __slots__ = (
         '__settings',
-        '__objects',
         '__colors'
     )
 
@@ -28,40 +31,36 @@ class Scene():
         self.__settings = settings
 
         # Create buttons
-        self.__objects: list[Any] = []
-        self.__objects.append(Button(
-            surface=(button_surface := display.font.render(" < ", False, (0, 0, 0), (200, 200, 200))),
+        self.add(Button(
+            surface=(button_surface := display.render_text(" < ", background=(200, 200, 200))),
             topleft=(
                 button_surface.get_width() * self.__settings.button_edge_spacing,
                 display.internal_surface.get_height() - button_surface.get_height() * self.__settings.button_edge_spacing - button_surface.get_height()
                 ),
             effect=lambda: setattr(self.__settings, 'gamestate', 'menu'),
+            target='menu',
         ))
-        self.__objects.append(Button(
-            surface=(button_surface := display.font.render(" > ", False, (0, 0, 0), (200, 200, 200))),
+        self.add(Button(
+            surface=(button_surface := display.render_text(" > ", background=(200, 200, 200))),
             topleft=(
                 display.internal_surface.get_width() - button_surface.get_width() * self.__settings.button_edge_spacing - button_surface.get_width(),
                 display.internal_surface.get_height() - button_surface.get_height() * self.__settings.button_edge_spacing - button_surface.get_height()
                 ),
             effect=lambda: setattr(self.__settings, 'gamestate', 'scene_2'),
+            target='scene_2',
         ))
 
         # Create map
-        self.__objects.append(settings.maps.get("Test_Map_1", None))
+        for map_name in MAP_NAMES:
+            self.add(settings.maps.get(map_name, None))
 
-    @property
-    def objects(self) -> list[Any]: return self.__objects
     @property
     def colors(self) -> dict[str, tuple[int, int, int]]: return self.__colors
     @property
     def name(self) -> str: return f"{self.__class__.__module__}"
+    @property
+    def animated(self) -> bool: return True  # The map simulates every tick
 
-    @objects.setter
-    def objects(self, value: list[Any]) -> None:
-        if isinstance(value, list):
-            self.__objects = value
-        else:
-            raise TypeError("Expected a list")
     @colors.setter
     def colors(self, key_value: tuple[str, tuple[int, int, int]]) -> None:
         key, value = key_value
@@ -0,0 +1,66 @@
+# scheduler.py
+
+import pygame
+
+
+class Scheduler:
+    """Paces the main loop, fixed simulation ticks with rendering at whatever rate the frame cap allows."""
+    __slots__ = (
+        '__tick_rate',
+        '__fps_cap',
+        '__max_ticks_per_frame',
+        '__clock',
+        '__accumulator'
+    )
+
+    def __init__(
+        self,
+        tick_rate: int = 60,
+        fps_cap: int | None = None,
+        max_ticks_per_frame: int = 5
+    ) -> None:
+        self.__tick_rate = tick_rate
+        self.__fps_cap = fps_cap
+        self.__max_ticks_per_frame = max_ticks_per_frame
+
+        self.__clock = pygame.time.Clock()
+        self.__accumulator: float = 0.0  # Seconds of simulation still owed
+
+    '''FUNCTIONS'''
+
+    def frame(self) -> int:
+        """Wait out the frame cap and return how many simulation ticks are due this frame."""
+        # Clock.tick sleeps when a cap is set, so a fast machine idles instead of spinning
+        self.__accumulator += self.__clock.tick(self.__fps_cap or 0) / 1000
+
+        ticks = int(self.__accumulator // self.tick_length)
+        if ticks > self.__max_ticks_per_frame:
+            # Too far behind to catch up, drop the backlog rather than stall every following frame
+            ticks = self.__max_ticks_per_frame
+            self.__accumulator = 0.0
+        else:
+            self.__accumulator -= ticks * self.tick_length
+
+        return ticks
+
+    def reset(self) -> None:
+        """Forget the time owed, after a long stall like a level load."""
+        self.__clock.tick()
+        self.__accumulator = 0.0
+
+    '''GETTERS'''
+
+    @property
+    def tick_rate(self) -> int: return self.__tick_rate
+    @property
+    def tick_length(self) -> float: return 1 / self.__tick_rate
+    @property
+    def fps_cap(self) -> int | None: return self.__fps_cap
+    @property
+    def fps(self) -> float: return self.__clock.get_fps()
+    @property
+    def alpha(self) -> float: return self.__accumulator / self.tick_length
+
+    @fps_cap.setter
+    def fps_cap(self, fps_cap: int | None) -> None:
+        self.__fps_cap = fps_cap
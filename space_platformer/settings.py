@@ -1,10 +1,11 @@
 # settings.py
 import pygame
 
+import os
 from typing import Any
 from os import PathLike
 
-from config import Clickable, Renderable, Scene, Collidable
+from config import Renderable, Scene
 
 
 class Settings():
@@ -13,7 +14,15 @@ class Settings():
     __slots__ = (
         '__gamestate',
         '__gamestates',
+        '__scenes',
+        '__scene_maps',
         '__display',
+        '__assets',
+        '__headless',
+        '__scheduler',
+        '__profiler',
+        '__map_cache',
+        '__loader',
         '__tracked_values'
     )
 
@@ -23,11 +32,50 @@ class Settings():
     # __DEFAULT_INTERNAL_RESOLUTION = (2293, 960)
     # __DEFAULT_EXTERNAL_RESOLUTION = (3440, 1440)
 
+    # Run without a window through SDL's dummy video driver, for servers and benchmarks
+    __HEADLESS = os.environ.get("SPACE_PLATFORMER_HEADLESS", "0") not in ("", "0")
+
     __FONT_SCALE_FACTOR = 36
 
+    __ASSET_CACHE_SIZE = 64
+    __TEXT_CACHE_SIZE = 256
+    __MAP_CACHE_SIZE = 4
+    __LOADER_WORKERS = 2
+
+    # Simulation ticks per second, and the render frame cap (None renders as fast as possible)
+    __SIMULATION_TICK_RATE = 60
+    __FPS_CAP: int | None = 120
+    __MAX_TICKS_PER_FRAME = 5
+
+    # Longest a scene without animation sleeps waiting for input, so finished loads and quits are still noticed
+    __IDLE_WAIT_TIMEOUT_MS = 250
+
+    # Frames kept for the rolling frame timing statistics
+    __PROFILER_WINDOW = 240
+
+    # Only redraw and present the regions that changed between frames
+    __DIRTY_RECT_PRESENTATION = True
+
+    # Tiles are never drawn smaller than this, maps that would need smaller tiles scroll with the camera instead
+    __MIN_TILE_SIZE = 32
+
+    # Maps are built and drawn in square chunks of this many tiles, only the ones near the camera
+    __CHUNK_SIZE = 16
+    # Chunks built ahead around the viewport, and how far away a chunk has to be to be evicted
+    __CHUNK_LOAD_MARGIN = 1
+    __CHUNK_EVICT_MARGIN = 2
+
     __BUTTON_EDGE_SPACING = 1/3
     __JUMPABLE_DISTANCE_THRESHOLD = 0.05
 
+    # Player movement, in tiles per second (per second squared for gravity)
+    __GRAVITY = 40
+    __JUMP_SPEED = 14
+    __WALK_SPEED = 8
+    __MAX_FALL_SPEED = 60
+    # How far, in pixels, the player may start inside a wall and still be stopped by it
+    __CONTACT_TOLERANCE = 1e-3
+
     __MAPS: dict[str, PathLike] = {
         "Test_Map_1": "space_platformer/assets/Test_Map_1.png",
         "Test_Map_2": "space_platformer/assets/Test_Map_2.png",
@@ -40,15 +88,38 @@ class Settings():
         (1, 1, 0, 1) : "PLAYER"   # Yellow
     }
 
+    # Collision layer bit of each tile type, collision filters by layer mask instead of by type
+    __MAP_COLLISION_LAYERS = {
+        "WALL" : 1 << 0,
+        "GOAL" : 1 << 1
+    }
+    # Layers the player can not move through, can jump off, and reacts to touching
+    __PLAYER_SOLID_MASK = __MAP_COLLISION_LAYERS["WALL"]
+    __PLAYER_GROUND_MASK = __MAP_COLLISION_LAYERS["WALL"]
+    __PLAYER_CONTACT_MASK = __MAP_COLLISION_LAYERS["WALL"] | __MAP_COLLISION_LAYERS["GOAL"]
+
+    # Tile types that get their own Brick object, every other tile is only drawn and collided with
+    __MAP_BEHAVIOR_TYPES = ("GOAL",)
+    # The type the edge of a map acts as
+    __MAP_EDGE_TYPE = "WALL"
+
     __MAP_ASSET_KEYS = {
         "WALL": "space_platformer/assets/wall.png",
         "GOAL": "space_platformer/assets/goal.png",
         "PLAYER": "space_platformer/assets/player.png",
     }
 
-    def __init__(self) -> None:
-        from map import Map
+    def __init__(
+        self,
+        headless: bool | None = None,
+        run: bool = True
+    ) -> None:
         from display import Display
+        from assets import AssetCache
+        from scheduler import Scheduler
+        from profiler import FrameProfiler
+        from map import MapCache
+        from loader import Loader
 
         import scene_1
         import scene_2
@@ -62,116 +133,288 @@ class Settings():
             "menu": menu
         }
 
+        # Scenes are built the first time they are entered and reused after
+        self.__scenes: dict[str, Scene] = {}
+        # Path of the map each scene shows, built maps only live in the map cache
+        self.__scene_maps: dict[str, PathLike | None] = {}
+
+        # Loaded and scaled asset surfaces, shared by every sprite
+        self.__assets = AssetCache(self.map_asset_keys, max_entries=self.asset_cache_size)
+
+        self.__headless = self.__HEADLESS if headless is None else headless
+
         # Initialize display
         self.__display = Display(
             self,
             internal_resolution=self.internal_resolution,
             external_resolution=self.external_resolution,
-            title="Space Platformer"
+            title="Space Platformer",
+            dirty_mode=self.dirty_rect_presentation,
+            headless=self.headless
+        )
+
+        self.__scheduler = Scheduler(
+            tick_rate=self.simulation_tick_rate,
+            fps_cap=self.fps_cap,
+            max_ticks_per_frame=self.max_ticks_per_frame
         )
 
+        self.__profiler = FrameProfiler(window=self.profiler_window)
+
+        # Built maps survive scene changes, revisiting a level only resets it
+        self.__map_cache = MapCache(self, max_entries=self.map_cache_size)
+        self.__loader = Loader(self, max_workers=self.loader_workers)
+
         # Default values
-        self.__tracked_values: dict[str, Any] = {}
+        self.__tracked_values: dict[str, Any] = {'profiler': self.__profiler}
+
+        if run:
+            self.run()
 
-        scene: Scene = self.gamestates[self.gamestate].Scene(self, self.display)
+    def run(self) -> None:
+        """Runs the main loop."""
+        scene: Scene = self.__activate_scene(self.gamestate)
         self.__tracked_values['has_map'] = False
+        self.__preload(scene)
+
+        # Map of the current scene that is still being decoded
+        pending_map: PathLike | None = None
 
         while True:
             if self.gamestate != str(scene):
                 if self.gamestate == "quit":
-                    quit()
-                scene: Scene = self.gamestates[self.gamestate].Scene(self, self.display)
-                for object_ in scene.objects:
-                    if object_ in self.maps.values():
-                        self.__tracked_values['has_map'] = True
-                        self.__tracked_values['map'] = Map(self, filepath=object_, display=self.display)
-                        scene.objects = [object_ for object_ in scene.objects if object_ not in self.maps.values()] + [self.__tracked_values['map']]
-                        # # Debugging to check that collision works
-                        # object_.player.pos = (object_.player.pos[0] - 5, object_.player.pos[1] - 5)
-                        break
-                else:
-                    self.__tracked_values['has_map'] = False
+                    self.__quit()
+                # The scene only keeps the path of its map, so the cache alone decides which maps stay built
+                if (map_ := self.__tracked_values.pop('map', None)) is not None:
+                    scene.replace(map_, self.__scene_maps[str(scene)])
+
+                scene: Scene = self.__activate_scene(self.gamestate)
+                self.__display.invalidate()
+                self.__tracked_values['has_map'] = False
+
+                # Cached maps are reset by the cache, the others are decoded in the background while a loading screen shows
+                if (pending_map := self.__scene_maps[str(scene)]) is not None and pending_map not in self.__map_cache:
+                    self.__loader.request(pending_map)
+                self.__preload(scene)
+
+                # Building the scene is not simulation time
+                self.__scheduler.reset()
+
+            if pending_map is not None:
+                if pending_map in self.__loader and not self.__loader.ready(pending_map):
+                    self.__render_loading(self.__loader.progress(pending_map))
+                    continue
+
+                # Only the surface conversion and the build are left for this thread
+                decoded = self.__loader.finish(pending_map) if pending_map in self.__loader else None
+                self.__tracked_values['has_map'] = True
+                self.__tracked_values['map'] = self.__map_cache.get(pending_map, self.display, decoded=decoded)
+                scene.replace(pending_map, self.__tracked_values['map'])
+                # # Debugging to check that collision works
+                # object_.player.pos = (object_.player.pos[0] - 5, object_.player.pos[1] - 5)
+
+                pending_map = None
+                self.__display.invalidate()
+                self.__scheduler.reset()
+
+            events: list[pygame.event.Event] | None = None
+            if self.__is_idle(scene):
+                # Nothing moves, so block until there is input instead of polling at the frame cap
+                events = self.__wait_for_events()
+                self.__scheduler.reset()
+
+                # Woke up on the timeout with nothing new, so there is nothing to redraw either
+                if not events and not self.__display.dirty_regions:
+                    continue
+                ticks = 0
+            else:
+                # Sleeps off the frame cap, then says how far the simulation has to catch up
+                ticks: int = self.__scheduler.frame()
+            self.__profiler.begin_frame()
+
+            with self.__profiler.phase('events'):
+                changed_values: dict[str, Any] = self.__event_handling(scene, pygame.event.get() if events is None else events)
+                self.__tracked_values.update(changed_values)
+
+            # Fixed steps keep physics independent of the frame rate
+            for _ in range(ticks):
+                if self.gamestate != str(scene):
+                    break
+                if self.tracked_values.get("has_map", False):
+                    with self.__profiler.phase('physics'):
+                        self.__step_player(self.tracked_values["map"])
+                    with self.__profiler.phase('collision'):
+                        self.__check_player_collision(self.tracked_values["map"])
+
+            with self.__profiler.phase('render'):
+                self.__render(scene)
 
-            changed_values: dict[str, Any] = self.__event_handling(scene)
-            self.__tracked_values.update(changed_values)
+            # Update display
+            with self.__profiler.phase('present'):
+                self.__display.update(self.tracked_values)
 
-            self.__render(scene)
-            
-            if self.tracked_values.get("has_map", False):
-                self.__check_player_collision(self.tracked_values["map"])
+            self.__profiler.end_frame()
 
-            # Update display
-            self.__display.update(self.tracked_values)
+
+    def __activate_scene(self, name: str) -> Scene:
+        """Return the scene of a gamestate, building it only the first time it is entered."""
+        if (scene := self.__scenes.get(name)) is None:
+            scene = self.gamestates[name].Scene(self, self.display)
+            self.__scenes[name] = scene
+            self.__scene_maps[name] = next((object_ for object_ in scene.objects if object_ in self.maps.values()), None)
+
+        scene.activate()
+        return scene
+
+
+    def __preload(self, scene: Scene) -> None:
+        """Start decoding the maps of the scenes this scene's buttons lead to."""
+        for object_ in scene.objects:
+            if (target := getattr(object_, 'target', None)) not in self.gamestates:
+                continue
+            for map_name in getattr(self.gamestates[target], 'MAP_NAMES', ()):
+                if (filepath := self.maps[map_name]) not in self.__map_cache:
+                    self.__loader.request(filepath)
+
+
+    def __render_loading(self, progress: float) -> None:
+        """Draws a loading screen with a progress bar, keeping the window responsive while maps decode."""
+        keys = pygame.key.get_pressed()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or keys[pygame.K_ESCAPE]:
+                self.__quit()
+
+        # Nothing to simulate, only keep the frame cap
+        self.__scheduler.frame()
+
+        width, height = self.__display.internal_surface.get_size()
+        self.__display.fill((0, 0, 0))
+
+        text_surface = self.__display.render_text("Loading...", color=(255, 255, 255), antialias=True)
+        self.__display.blit(text_surface, (width // 2 - text_surface.get_width() // 2, height // 2 - text_surface.get_height()))
+
+        bar = pygame.Rect(width // 4, height // 2 + text_surface.get_height() // 2, width // 2, text_surface.get_height() // 2)
+        pygame.draw.rect(self.__display.internal_surface, (255, 255, 255), bar, 1)
+        pygame.draw.rect(self.__display.internal_surface, (255, 255, 255), (*bar.topleft, round(bar.width * progress), bar.height))
+
+        self.__display.invalidate()
+        self.__display.update({})
+
+
+    def __is_idle(self, scene: Scene) -> bool:
+        """Whether the scene has nothing animating or simulating, scenes that do not say are assumed to."""
+        # The debug overlay shows live frame timings
+        return not getattr(scene, 'animated', True) and not self.tracked_values.get('debug_mode', False)
+
+
+    def __wait_for_events(self) -> list[pygame.event.Event]:
+        """Sleep until an event arrives or the idle timeout runs out, then take every queued event."""
+        event = pygame.event.wait(self.idle_wait_timeout_ms)
+        return ([] if event.type == pygame.NOEVENT else [event]) + pygame.event.get()
 
 
-    def __event_handling(self, scene: Scene) -> dict[str, Any]:
+    def __event_handling(self, scene: Scene, events: list[pygame.event.Event]) -> dict[str, Any]:
         """Handles events such as mouse clicks and keyboard inputs."""
         new_values: dict[str, Any] = {}
 
         # Get held keys
         keys = pygame.key.get_pressed()
+        new_values['walk'] = (keys[pygame.K_RIGHT] or keys[pygame.K_d]) - (keys[pygame.K_LEFT] or keys[pygame.K_a])
         # Get accurate mouse position
         new_values['mouse_pos'] = ([x * y / z for x, y, z in zip(pygame.mouse.get_pos(), self.display.internal_surface.get_size(), self.display.screen.get_size())])
 
-        objects: list[Renderable | Clickable] = scene.objects
+        # Only the clickables under the mouse are looked at, not every one in the scene
+        left, entered = scene.hit_index.hover(new_values['mouse_pos'])
+        if left is not None and hasattr(left, 'hover_leave'):
+            left.hover_leave()
+        if entered is not None and hasattr(entered, 'hover_enter'):
+            entered.hover_enter()
+        new_values['button_hover'] = scene.hit_index.hovered
 
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT or keys[pygame.K_ESCAPE]:
                 self.__quit()
 
+            # The window lost its contents, only redrawing the dirty regions would leave the rest stale
+            if event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                self.display.invalidate()
+
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE and keys[pygame.K_LCTRL]:
                     new_values['debug_mode'] = not self.tracked_values['debug_mode'] if 'debug_mode' in self.tracked_values else True
+                    self.display.invalidate()  # Draw over the overlay once it is turned off
                 elif event.key == pygame.K_SPACE:
                     new_values['jumped'] = True
                     new_values['jumped_pos'] = new_values['mouse_pos']
                 else:
                     new_values['jumped_pos'] = None
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:
-                    for button in [obj for obj in objects if isinstance(obj, Clickable)]:
-                        if button.rect.collidepoint(new_values['mouse_pos']):
-                            button.clicked()
+                if event.button == 1 and (button := scene.hit_index.topmost(new_values['mouse_pos'])) is not None:
+                    button.clicked()
 
         return new_values
 
 
+    def __step_player(self, map_: pygame.sprite.Sprite) -> None:
+        """Move the player one tick, swept through the tile grid so no speed can carry it through a wall."""
+        player = map_.player
+
+        # A jump is used up by the first tick that sees it
+        jump = self.__tracked_values.pop('jumped', False)
+        motion = player.step(self.__scheduler.tick_length, self.tracked_values.get('walk', 0), jump)
+
+        position, contacts = map_.move(player.exact_position, player.rect.size, motion)
+        player.move_to(position)
+        for contact in contacts:
+            player.collide(contact)
+
+
     def __check_player_collision(self, map_: pygame.sprite.Sprite) -> None:
-        from player import Player
+        player = map_.player
 
-        wall_collided: Collidable = pygame.sprite.spritecollideany(
-            (player := map_.player), [brick for brick in map_.collidable_objects if brick.type == "WALL"],
-            # collided=__check_player_grounded
-            collided=lambda s1, s2: s1.rect.colliderect(s2.grounded_rect) if isinstance(s2, Player) else s1.grounded_rect.colliderect(s2.rect)
-        )
-        if wall_collided and not player.grounded:
+        # One broadphase query over the tiles around the player answers for its body and the strip under its feet
+        body, ground = map_.contacts((player.rect, player.grounded_rect), self.player_contact_mask)
+
+        if not player.grounded and any(
+            candidate.layer & self.player_ground_mask for candidates in ground.values() for candidate in candidates
+        ):
             player.grounded = True
 
-        collided_objects: list[Collidable] = pygame.sprite.spritecollide(
-            player, map_.collidable_objects,
-            dokill=False
-        )
-        did_wall: bool = False
-        for collided in collided_objects:
-            if collided.type == "WALL" and not did_wall:
-                did_wall = True
-            player.collide(collided)
+        for collided_objects in body.values():
+            for collided in collided_objects:
+                player.collide(collided)
 
 
     def __render(self, scene) -> None:
         """Renders the given objects."""
-        self.__display.fill(scene.colors.get('BACKGROUND_COLOR', (0, 0, 0)))
-
-        for object in [obj for obj in scene.objects if isinstance(obj, Renderable)]:
-            object.render(self.display)
+        renderables: list[Renderable] = scene.renderables
+
+        # The debug overlay changes every frame
+        if self.tracked_values.get('debug_mode', False) or not self.__display.dirty_mode:
+            self.__display.invalidate()
+        else:
+            for object in renderables:
+                for rect in object.dirty_rects():
+                    self.__display.invalidate(rect)
+
+        # Redraw everything that overlaps each changed region, clipped to it, in one batch per region
+        for region in self.__display.dirty_regions:
+            self.__display.clip = region
+            self.__display.fill(scene.colors.get('BACKGROUND_COLOR', (0, 0, 0)))
+
+            for object in renderables:
+                object.render(self.display)
+            self.__display.flush()
+        self.__display.clip = None
 
         if self.tracked_values.get('debug_mode', False):
-            for object in [obj for obj in scene.objects if hasattr(obj, 'debug')]:
+            for object in scene.debuggables:
                 object.debug(self.display)
 
 
-    def __quit() -> None:
-        """Quits the Pygame instance."""
+    def __quit(self) -> None:
+        """Stops the loader and quits the Pygame instance."""
+        self.__loader.shutdown()
         pygame.quit()
         exit()
 
@@ -181,20 +424,84 @@ class Settings():
     @property
     def external_resolution(self) -> tuple[int, int]: return self.__DEFAULT_EXTERNAL_RESOLUTION
     @property
+    def headless(self) -> bool: return self.__headless
+    @property
     def font_scale_factor(self) -> int: return self.__FONT_SCALE_FACTOR
     @property
     def button_edge_spacing(self) -> float: return self.__BUTTON_EDGE_SPACING
     @property
     def jumpable_distance_threshold(self) -> int: return self.__JUMPABLE_DISTANCE_THRESHOLD
     @property
+    def gravity(self) -> float: return self.__GRAVITY
+    @property
+    def jump_speed(self) -> float: return self.__JUMP_SPEED
+    @property
+    def walk_speed(self) -> float: return self.__WALK_SPEED
+    @property
+    def max_fall_speed(self) -> float: return self.__MAX_FALL_SPEED
+    @property
+    def contact_tolerance(self) -> float: return self.__CONTACT_TOLERANCE
+    @property
     def gamestate(self) -> str: return self.__gamestate
     @property
     def gamestates(self) -> dict[str, Any]: return self.__gamestates
     @property
+    def scenes(self) -> dict[str, Scene]: return self.__scenes
+    @property
     def map_color_keys(self) -> dict[tuple[int, int, int], str]: return self.__MAP_COLOR_KEYS
     @property
+    def map_behavior_types(self) -> tuple[str, ...]: return self.__MAP_BEHAVIOR_TYPES
+    @property
+    def map_collision_layers(self) -> dict[str, int]: return self.__MAP_COLLISION_LAYERS
+    @property
+    def player_solid_mask(self) -> int: return self.__PLAYER_SOLID_MASK
+    @property
+    def player_ground_mask(self) -> int: return self.__PLAYER_GROUND_MASK
+    @property
+    def player_contact_mask(self) -> int: return self.__PLAYER_CONTACT_MASK
+    @property
+    def map_edge_type(self) -> str | None: return self.__MAP_EDGE_TYPE
+    @property
     def map_asset_keys(self) -> dict[str, str]: return self.__MAP_ASSET_KEYS
     @property
+    def asset_cache_size(self) -> int: return self.__ASSET_CACHE_SIZE
+    @property
+    def text_cache_size(self) -> int: return self.__TEXT_CACHE_SIZE
+    @property
+    def map_cache_size(self) -> int: return self.__MAP_CACHE_SIZE
+    @property
+    def map_cache(self) -> Any: return self.__map_cache
+    @property
+    def loader_workers(self) -> int: return self.__LOADER_WORKERS
+    @property
+    def loader(self) -> Any: return self.__loader
+    @property
+    def assets(self) -> Any: return self.__assets
+    @property
+    def simulation_tick_rate(self) -> int: return self.__SIMULATION_TICK_RATE
+    @property
+    def fps_cap(self) -> int | None: return self.__FPS_CAP
+    @property
+    def max_ticks_per_frame(self) -> int: return self.__MAX_TICKS_PER_FRAME
+    @property
+    def idle_wait_timeout_ms(self) -> int: return self.__IDLE_WAIT_TIMEOUT_MS
+    @property
+    def scheduler(self) -> Any: return self.__scheduler
+    @property
+    def profiler_window(self) -> int: return self.__PROFILER_WINDOW
+    @property
+    def profiler(self) -> Any: return self.__profiler
+    @property
+    def dirty_rect_presentation(self) -> bool: return self.__DIRTY_RECT_PRESENTATION
+    @property
+    def min_tile_size(self) -> int: return self.__MIN_TILE_SIZE
+    @property
+    def chunk_size(self) -> int: return self.__CHUNK_SIZE
+    @property
+    def chunk_load_margin(self) -> int: return self.__CHUNK_LOAD_MARGIN
+    @property
+    def chunk_evict_margin(self) -> int: return self.__CHUNK_EVICT_MARGIN
+    @property
     def display(self) -> Any: return self.__display
     @property
     def tracked_values(self) -> dict[str, Any]: return self.__tracked_values
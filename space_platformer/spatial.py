@@ -0,0 +1,165 @@
+# spatial.py
+
+import pygame
+
+from math import floor
+from typing import Any
+
+
+class SpatialHash:
+    """Uniform grid over objects with a rect, answers which objects overlap a given rect."""
+    __slots__ = (
+        '__cell_size',
+        '__origin',
+        '__cells',
+        '__objects'
+    )
+
+    def __init__(
+        self,
+        cell_size: float,
+        origin: tuple[float, float] = (0, 0)
+    ) -> None:
+        if cell_size <= 0:
+            raise ValueError("Cell size must be positive")
+
+        self.__cell_size = cell_size
+        self.__origin = origin
+
+        self.__cells: dict[tuple[int, int], list[Any]] = {}
+        self.__objects: dict[Any, pygame.Rect] = {}  # Rect each object was inserted with
+
+    '''FUNCTIONS'''
+
+    def insert(self, object_: Any, rect: pygame.Rect | None = None) -> None:
+        """Add an object under its rect, or under the given rect."""
+        rect = pygame.Rect(object_.rect if rect is None else rect)
+        self.__objects[object_] = rect
+
+        for cell in self.__cells_of(rect):
+            self.__cells.setdefault(cell, []).append(object_)
+
+    def remove(self, object_: Any) -> None:
+        """Remove an object from every cell it was inserted into."""
+        if (rect := self.__objects.pop(object_, None)) is None:
+            return
+
+        for cell in self.__cells_of(rect):
+            bucket = self.__cells[cell]
+            bucket.remove(object_)
+            if not bucket:
+                del self.__cells[cell]
+
+    def query(self, rect: pygame.Rect) -> list[Any]:
+        """Return every object whose rect overlaps the given rect."""
+        found: dict[Any, None] = {}  # Keeps order, objects spanning several cells are only reported once
+
+        for cell in self.__cells_of(rect):
+            for object_ in self.__cells.get(cell, ()):
+                if object_ not in found and self.__objects[object_].colliderect(rect):
+                    found[object_] = None
+
+        return list(found)
+
+    def clear(self) -> None:
+        """Remove every object."""
+        self.__cells.clear()
+        self.__objects.clear()
+
+    def __cells_of(self, rect: pygame.Rect) -> list[tuple[int, int]]:
+        """Cells covered by a rect."""
+        left, top, width, height = rect
+        origin_x, origin_y = self.__origin
+
+        first_x = floor((left - origin_x) / self.__cell_size)
+        first_y = floor((top - origin_y) / self.__cell_size)
+        last_x = floor((left + max(width, 1) - 1 - origin_x) / self.__cell_size)
+        last_y = floor((top + max(height, 1) - 1 - origin_y) / self.__cell_size)
+
+        return [(x, y) for y in range(first_y, last_y + 1) for x in range(first_x, last_x + 1)]
+
+    '''GETTERS'''
+
+    @property
+    def cell_size(self) -> float: return self.__cell_size
+    @property
+    def origin(self) -> tuple[float, float]: return self.__origin
+
+    '''DUNDERS'''
+
+    def __len__(self) -> int:
+        return len(self.__objects)
+
+    def __contains__(self, object_: Any) -> bool:
+        return object_ in self.__objects
+
+
+class HitTestIndex:
+    """Finds the topmost object under a point through a spatial hash, and tracks which one is hovered.
+
+    Objects added later are on top, the same order they are drawn in.
+    """
+    __slots__ = (
+        '__spatial_hash',
+        '__depths',
+        '__next_depth',
+        '__hovered'
+    )
+
+    def __init__(self, cell_size: float = 64) -> None:
+        self.__spatial_hash = SpatialHash(cell_size)
+        self.__depths: dict[Any, int] = {}
+        self.__next_depth = 0
+        self.__hovered: Any | None = None
+
+    '''FUNCTIONS'''
+
+    def insert(self, object_: Any) -> None:
+        """Add an object on top of every other one."""
+        self.__spatial_hash.insert(object_)
+        self.__depths[object_] = self.__next_depth
+        self.__next_depth += 1
+
+    def remove(self, object_: Any) -> None:
+        """Remove an object, it stops being hovered."""
+        self.__spatial_hash.remove(object_)
+        self.__depths.pop(object_, None)
+        if self.__hovered is object_:
+            self.__hovered = None
+
+    def move(self, object_: Any) -> None:
+        """Re-file an object whose rect changed, keeping its depth."""
+        self.__spatial_hash.remove(object_)
+        self.__spatial_hash.insert(object_)
+
+    def topmost(self, point: tuple[float, float]) -> Any | None:
+        """The object on top at a point, None if there is none."""
+        candidates = self.__spatial_hash.query(pygame.Rect(int(point[0]), int(point[1]), 1, 1))
+        return max(candidates, key=self.__depths.__getitem__, default=None)
+
+    def hover(self, point: tuple[float, float]) -> tuple[Any | None, Any | None]:
+        """Move the hover to a point, returns the object left and the object entered, None for no change."""
+        if (topmost := self.topmost(point)) is self.__hovered:
+            return None, None
+
+        left, self.__hovered = self.__hovered, topmost
+        return left, topmost
+
+    def clear(self) -> None:
+        """Remove every object."""
+        self.__spatial_hash.clear()
+        self.__depths.clear()
+        self.__hovered = None
+
+    '''GETTERS'''
+
+    @property
+    def hovered(self) -> Any | None: return self.__hovered
+
+    '''DUNDERS'''
+
+    def __len__(self) -> int:
+        return len(self.__depths)
+
+    def __contains__(self, object_: Any) -> bool:
+        return object_ in self.__depths
@@ -0,0 +1,21 @@
+# conftest.py
+
+import os
+import sys
+
+import pytest
+
+# Modules import each other by name, the same as when the game is run from its folder
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    """Headless settings that do not start the game, asset paths resolve from the repo root."""
+    monkeypatch.chdir(os.path.dirname(PACKAGE_DIR))
+
+    from settings import Settings
+    return Settings(headless=True, run=False)
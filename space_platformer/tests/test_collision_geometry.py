@@ -0,0 +1,34 @@
+# test_collision_geometry.py
+
+import random
+
+from map_format import build_collision_geometry
+from tile_grid import TileGrid
+
+
+def covered_cells(rects) -> dict[tuple[int, int], str]:
+    """Type of every cell the rects cover, failing on cells covered twice."""
+    cells: dict[tuple[int, int], str] = {}
+    for x, y, width, height, type_ in rects:
+        for cell_y in range(y, y + height):
+            for cell_x in range(x, x + width):
+                assert (cell_x, cell_y) not in cells
+                cells[cell_x, cell_y] = type_
+    return cells
+
+
+def test_merged_rects_cover_exactly_the_tiles():
+    rng = random.Random(0)
+    rows = [[rng.choice(["WALL", "WALL", "GOAL", None]) for _ in range(40)] for _ in range(30)]
+    tile_grid = TileGrid.from_rows(rows)
+
+    rects = build_collision_geometry(tile_grid)
+
+    assert covered_cells(rects) == {(x, y): type_ for x, y, type_ in tile_grid.cells()}
+    assert len(rects) < sum(1 for _ in tile_grid.cells())
+
+
+def test_solid_block_becomes_one_rect():
+    tile_grid = TileGrid.from_rows([["WALL"] * 4 for _ in range(3)])
+
+    assert build_collision_geometry(tile_grid) == [(0, 0, 4, 3, "WALL")]
@@ -0,0 +1,38 @@
+# test_display.py
+
+import os
+import random
+
+import pygame
+import pytest
+
+from display import Display
+
+
+def noise(size: tuple[int, int]) -> pygame.Surface:
+    """A surface of random pixels, any sampling difference shows up in it."""
+    return pygame.image.frombytes(os.urandom(size[0] * size[1] * 3), size, "RGB")
+
+
+@pytest.mark.parametrize("internal, external", [
+    ((1280, 720), (1920, 1080)),
+    ((1280, 780), (1920, 1080)),
+    ((1280, 720), (1366, 768))
+])
+def test_dirty_present_matches_full_present(settings, internal, external):
+    display = Display(settings, internal, external, dirty_mode=True, headless=True)
+    surface = display.internal_surface
+    rng = random.Random(0)
+
+    surface.blit(noise(internal), (0, 0))
+    display.update({})
+
+    for _ in range(30):
+        rect = pygame.Rect(rng.randrange(internal[0]), rng.randrange(internal[1]), rng.randint(1, 97), rng.randint(1, 97))
+        rect = rect.clip(surface.get_rect())
+        surface.blit(noise(rect.size), rect)
+        display.invalidate(rect)
+        display.update({})
+
+        expected = pygame.transform.scale(surface, external)
+        assert pygame.image.tobytes(display.screen, "RGB") == pygame.image.tobytes(expected, "RGB")
@@ -0,0 +1,23 @@
+# test_loader.py
+
+from loader import Loader
+from map_format import decode_image
+
+
+def test_finish_hands_over_the_decoded_map(settings):
+    loader = Loader(settings, max_workers=1)
+    filepath = settings.maps["Test_Map_1"]
+
+    loader.request(filepath)
+    loader.request(filepath)  # Already started, nothing new is queued
+    assert filepath in loader
+
+    decoded = loader.finish(filepath)
+    expected = decode_image(filepath, settings.map_color_keys)
+
+    assert decoded.tile_grid == expected.tile_grid
+    assert decoded.player_spawn_pos == expected.player_spawn_pos
+    assert filepath not in loader
+    assert loader.progress(filepath) == 1.0
+
+    loader.shutdown()
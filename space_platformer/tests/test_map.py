@@ -0,0 +1,29 @@
+# test_map.py
+
+import pygame
+
+from map import Map
+
+
+def test_contacts_are_filtered_by_layer_mask(settings):
+    map_ = Map(settings, filepath=settings.maps["Test_Map_1"], display=settings.display)
+    layers = settings.map_collision_layers
+    everything = pygame.Rect(map_.camera.bounds)
+
+    walls, = map_.contacts((everything,), layers["WALL"])
+    goals, = map_.contacts((everything,), layers["GOAL"])
+    both, = map_.contacts((everything,), layers["WALL"] | layers["GOAL"])
+
+    assert set(walls) == {"WALL"} and set(goals) == {"GOAL"}
+    assert both == walls | goals
+    assert all(candidate.layer == layers[type_] for type_, candidates in both.items() for candidate in candidates)
+
+
+def test_contacts_match_one_query_per_rect(settings):
+    map_ = Map(settings, filepath=settings.maps["Test_Map_1"], display=settings.display)
+    player = map_.player
+    rects = (player.rect.inflate(200, 200), player.grounded_rect)
+
+    for rect, contacts in zip(rects, map_.contacts(rects)):
+        expected = sorted(id(candidate) for candidate in map_.query(rect))
+        assert sorted(id(candidate) for candidates in contacts.values() for candidate in candidates) == expected
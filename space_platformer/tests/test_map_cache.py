@@ -0,0 +1,40 @@
+# test_map_cache.py
+
+from map import MapCache
+
+
+def test_revisits_reuse_the_map_and_reset_it(settings):
+    cache = MapCache(settings, max_entries=2)
+    filepath = settings.maps["Test_Map_1"]
+
+    map_ = cache.get(filepath, settings.display)
+    spawn = map_.player.rect.topleft
+    map_.player.move_to((0.0, 0.0))
+
+    assert cache.get(filepath, settings.display) is map_
+    assert map_.player.rect.topleft == spawn
+
+
+def test_least_recently_used_map_is_evicted(settings):
+    cache = MapCache(settings, max_entries=1)
+    first, second = settings.maps["Test_Map_1"], settings.maps["Test_Map_2"]
+
+    map_ = cache.get(first, settings.display)
+    cache.get(second, settings.display)
+
+    assert len(cache) == 1
+    assert first not in cache and second in cache
+    assert cache.get(first, settings.display) is not map_
+
+
+def test_invalidate_drops_a_path(settings):
+    cache = MapCache(settings)
+    first, second = settings.maps["Test_Map_1"], settings.maps["Test_Map_2"]
+    cache.get(first, settings.display)
+    cache.get(second, settings.display)
+
+    cache.invalidate(first)
+    assert first not in cache and second in cache
+
+    cache.invalidate()
+    assert len(cache) == 0
@@ -0,0 +1,67 @@
+# test_map_format.py
+
+import shutil
+
+import pytest
+
+from map_format import (
+    DecodedMap, compile_map, compiled_path, convert_map, decode_image, decode_map, is_current, open_raw, raw_path, read_compiled
+)
+from tile_grid import MappedTileGrid
+
+
+@pytest.fixture
+def map_image(settings, tmp_path):
+    """A copy of a shipped map, so the files written next to it stay out of the assets."""
+    return str(shutil.copy(settings.maps["Test_Map_1"], tmp_path))
+
+
+def assert_same_map(decoded: DecodedMap, expected: DecodedMap) -> None:
+    assert decoded.tile_grid == expected.tile_grid
+    assert decoded.player_spawn_pos == expected.player_spawn_pos
+    assert decoded.goals == expected.goals
+
+
+def test_compiled_map_round_trips(settings, map_image):
+    expected = decode_image(map_image, settings.map_color_keys)
+    compiled = compile_map(map_image, settings.map_color_keys)
+
+    decoded = read_compiled(compiled)
+    assert_same_map(decoded, expected)
+    assert decoded.collision_geometry == expected.collision_geometry
+    assert_same_map(decode_map(map_image, settings.map_color_keys), expected)
+
+
+def test_compiled_map_with_other_color_keys_is_not_used(settings, map_image):
+    compile_map(map_image, settings.map_color_keys)
+    swapped = {key: {"WALL": "GOAL", "GOAL": "WALL"}.get(type_, type_) for key, type_ in settings.map_color_keys.items()}
+
+    assert is_current(compiled_path(map_image), map_image, settings.map_color_keys)
+    assert not is_current(compiled_path(map_image), map_image, swapped)
+    assert_same_map(decode_map(map_image, swapped), decode_image(map_image, swapped))
+
+
+def test_raw_tile_file_round_trips(settings, map_image):
+    expected = decode_image(map_image, settings.map_color_keys)
+    raw = convert_map(map_image, settings.map_color_keys)
+
+    decoded = open_raw(raw)
+    assert isinstance(decoded.tile_grid, MappedTileGrid)
+    assert_same_map(decoded, expected)
+    assert decoded.collision_geometry is None
+    decoded.tile_grid.close()
+
+    # The raw file wins over the image, until the color keys change
+    decoded = decode_map(map_image, settings.map_color_keys)
+    assert isinstance(decoded.tile_grid, MappedTileGrid)
+    decoded.tile_grid.close()
+    swapped = {key: {"WALL": "GOAL", "GOAL": "WALL"}.get(type_, type_) for key, type_ in settings.map_color_keys.items()}
+    assert not is_current(raw_path(map_image), map_image, swapped)
+
+
+def test_raw_tile_grid_is_read_only(settings, map_image):
+    tile_grid = open_raw(convert_map(map_image, settings.map_color_keys)).tile_grid
+
+    with pytest.raises(TypeError):
+        tile_grid.set(0, 0, None)
+    tile_grid.close()
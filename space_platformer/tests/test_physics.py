@@ -0,0 +1,60 @@
+# test_physics.py
+
+from physics import move, sweep
+from tile_grid import TileGrid
+
+
+def grid(*rows: str) -> tuple[TileGrid, frozenset[int]]:
+    """A grid from rows of text, # is a wall and G a goal."""
+    names = {"#": "WALL", "G": "GOAL", ".": None}
+    tile_grid = TileGrid.from_rows([[names[cell] for cell in row] for row in rows])
+    return tile_grid, frozenset({tile_grid.id_of("WALL")})
+
+
+def test_landing_flush_on_a_tile_hits_it():
+    tile_grid, solid_ids = grid(
+        "...",
+        "...",
+        "###"
+    )
+    # Falls exactly the distance to the floor, ending flush on it
+    position, contacts = move(tile_grid, (1.0, 0.5, 1.0, 1.0), (0.0, 0.5), solid_ids)
+
+    assert position == (1.0, 1.0)
+    assert [(contact.cell, contact.normal) for contact in contacts] == [((1, 2), (0, -1))]
+
+
+def test_moving_flush_against_a_wall_hits_it():
+    tile_grid, solid_ids = grid(
+        "...#",
+        "...#"
+    )
+    hit, _ = sweep(tile_grid, (0.5, 0.0, 1.0, 1.0), (1.5, 0.0), solid_ids)
+
+    assert hit is not None
+    assert (hit.time, hit.normal, hit.cell) == (1.0, (-1, 0), (3, 0))
+
+
+def test_ending_flush_against_a_passable_tile_does_not_touch_it():
+    tile_grid, solid_ids = grid(
+        "..G",
+        "..."
+    )
+    hit, touched = sweep(tile_grid, (0.0, 0.0, 1.0, 1.0), (1.0, 0.0), solid_ids)
+
+    assert hit is None
+    assert touched == []
+
+
+def test_contact_tolerance_is_the_same_at_every_speed():
+    tile_grid, solid_ids = grid(
+        "....#",
+    )
+    for speed in (0.1, 1.0, 100.0):
+        # Just inside the wall, within the tolerance, the wall still stops the box
+        hit, _ = sweep(tile_grid, (3.0 + 5e-7, 0.0, 1.0, 1.0), (speed, 0.0), solid_ids, tolerance=1e-6)
+        assert hit is not None and hit.cell == (4, 0)
+
+        # Further inside it is treated as stuck in the wall, and let out
+        hit, _ = sweep(tile_grid, (3.0 + 1e-3, 0.0, 1.0, 1.0), (speed, 0.0), solid_ids, tolerance=1e-6)
+        assert hit is None
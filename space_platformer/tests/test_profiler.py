@@ -0,0 +1,41 @@
+# test_profiler.py
+
+from profiler import FrameProfiler
+
+
+def test_repeated_phases_add_up_and_missing_ones_count_as_zero():
+    profiler = FrameProfiler(window=10)
+
+    profiler.begin_frame()
+    with profiler.phase('render'):
+        pass
+    with profiler.phase('render'):
+        pass
+    profiler.end_frame()
+
+    profiler.begin_frame()
+    profiler.end_frame()
+
+    assert set(profiler.phases) == {'render', 'frame'}
+    assert sum(profiler.histogram('render')) == 2
+    assert profiler.stats('render')['max'] >= profiler.stats('render')['mean'] > 0
+
+
+def test_window_keeps_only_the_latest_frames():
+    profiler = FrameProfiler(window=3)
+    for _ in range(5):
+        profiler.begin_frame()
+        profiler.end_frame()
+
+    assert sum(profiler.histogram('frame')) == 3
+
+    profiler.reset()
+    assert profiler.phases == []
+    assert profiler.stats('frame') == {'mean': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+
+
+def test_end_frame_without_begin_stores_nothing():
+    profiler = FrameProfiler()
+    profiler.end_frame()
+
+    assert profiler.phases == []
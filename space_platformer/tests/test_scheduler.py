@@ -0,0 +1,56 @@
+# test_scheduler.py
+
+import pygame
+import pytest
+
+from scheduler import Scheduler
+
+
+class FakeClock:
+    """Clock that reports the frame times it is given instead of the real ones."""
+
+    def __init__(self) -> None:
+        self.elapsed: list[int] = []
+
+    def tick(self, framerate: int = 0) -> int:
+        return self.elapsed.pop(0) if self.elapsed else 0
+
+    def get_fps(self) -> float:
+        return 0.0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(pygame.time, "Clock", lambda: clock)
+    return clock
+
+
+def test_ticks_follow_elapsed_time(clock):
+    scheduler = Scheduler(tick_rate=8, max_ticks_per_frame=5)
+
+    # 300 ms is two 125 ms ticks, the 50 ms left over carries into the next frame
+    clock.elapsed = [300, 100, 0]
+    assert scheduler.frame() == 2
+    assert scheduler.frame() == 1
+    assert scheduler.frame() == 0
+    assert scheduler.alpha == pytest.approx(0.2)
+
+
+def test_backlog_is_clamped_and_dropped(clock):
+    scheduler = Scheduler(tick_rate=8, max_ticks_per_frame=5)
+
+    clock.elapsed = [5000, 0]
+    assert scheduler.frame() == 5
+    assert scheduler.frame() == 0
+    assert scheduler.alpha == 0
+
+
+def test_reset_forgets_time_owed(clock):
+    scheduler = Scheduler(tick_rate=8, max_ticks_per_frame=5)
+
+    clock.elapsed = [100, 0, 0]
+    scheduler.frame()
+    scheduler.reset()
+    assert scheduler.alpha == 0
+    assert scheduler.frame() == 0
@@ -0,0 +1,61 @@
+# test_spatial.py
+
+import pygame
+
+from spatial import HitTestIndex, SpatialHash
+
+
+class Box:
+    def __init__(self, rect: tuple[int, int, int, int]) -> None:
+        self.rect = pygame.Rect(rect)
+
+
+def test_spatial_hash_query_matches_overlap():
+    spatial_hash = SpatialHash(16)
+    boxes = [Box((x * 10, y * 10, 12, 12)) for x in range(10) for y in range(10)]
+    for box in boxes:
+        spatial_hash.insert(box)
+
+    area = pygame.Rect(25, 33, 40, 18)
+    assert set(spatial_hash.query(area)) == {box for box in boxes if box.rect.colliderect(area)}
+
+
+def test_topmost_is_the_last_inserted():
+    index = HitTestIndex(cell_size=32)
+    below, above = Box((0, 0, 100, 100)), Box((50, 50, 100, 100))
+    index.insert(below)
+    index.insert(above)
+
+    assert index.topmost((60, 60)) is above
+    assert index.topmost((10, 10)) is below
+    assert index.topmost((300, 300)) is None
+
+
+def test_hover_reports_only_changes():
+    index = HitTestIndex()
+    first, second = Box((0, 0, 10, 10)), Box((20, 0, 10, 10))
+    index.insert(first)
+    index.insert(second)
+
+    assert index.hover((5, 5)) == (None, first)
+    assert index.hover((6, 6)) == (None, None)
+    assert index.hover((25, 5)) == (first, second)
+    assert index.hover((50, 50)) == (second, None)
+    assert index.hovered is None
+
+
+def test_remove_and_move():
+    index = HitTestIndex()
+    box = Box((0, 0, 10, 10))
+    index.insert(box)
+    index.hover((5, 5))
+
+    box.rect.topleft = (100, 100)
+    index.move(box)
+    assert index.topmost((5, 5)) is None
+    assert index.topmost((105, 105)) is box
+
+    index.remove(box)
+    assert box not in index and len(index) == 0
+    assert index.hovered is None
+    assert index.topmost((105, 105)) is None
@@ -0,0 +1,42 @@
+# test_tile_grid.py
+
+import pytest
+
+from tile_grid import TileGrid
+
+
+ROWS = [
+    ["WALL", None, "WALL"],
+    [None, "GOAL", None]
+]
+
+
+def test_rows_round_trip():
+    tile_grid = TileGrid.from_rows(ROWS)
+
+    assert tile_grid.size == (3, 2)
+    assert tile_grid.to_rows() == ROWS
+    assert tile_grid[1, 1] == tile_grid.type_at(1, 1) == "GOAL"
+    assert tile_grid.type_at(5, 5) is None
+
+
+def test_set_and_find():
+    tile_grid = TileGrid.from_rows(ROWS)
+
+    tile_grid.set(1, 0, "WALL")
+    assert tile_grid.find("WALL") == [(0, 0), (1, 0), (2, 0)]
+    assert tile_grid.find("SPIKE") == []
+    with pytest.raises(KeyError):
+        tile_grid.set(0, 0, "SPIKE")
+
+
+def test_region_is_clipped_to_the_grid():
+    tile_grid = TileGrid.from_rows(ROWS)
+
+    assert tile_grid.region(1, 0, 5, 5).to_rows() == [[None, "WALL"], ["GOAL", None]]
+    assert tile_grid.region(-2, -2, 1, 1).size == (0, 0)
+
+
+def test_wrong_tile_count_is_rejected():
+    with pytest.raises(ValueError):
+        TileGrid(2, 2, ["WALL"], b"\x01")
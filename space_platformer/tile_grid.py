@@ -0,0 +1,188 @@
+# tile_grid.py
+
+import mmap
+from os import PathLike
+from typing import Iterator, Sequence
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TileGrid:
+    """Grid of tile ids, one byte per cell in row-major order, with a table from id to tile type."""
+    __slots__ = (
+        '__width',
+        '__height',
+        '__tiles',
+        '__types',
+        '__ids'
+    )
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        types: Sequence[str],
+        tiles: bytes | bytearray | mmap.mmap | None = None,
+        share: bool = False
+    ) -> None:
+        if len(types) > 255:
+            raise ValueError("A tile grid holds at most 255 tile types")
+        if tiles is not None and len(tiles) != width * height:
+            raise ValueError(f"Expected {width * height} tiles, got {len(tiles)}")
+
+        self.__width = width
+        self.__height = height
+        # Shared buffers, like a memory map, are used as they are instead of copied
+        if tiles is None:
+            self.__tiles = bytearray(width * height)
+        else:
+            self.__tiles = tiles if share else bytearray(tiles)
+
+        # Id 0 is the empty tile
+        self.__types: tuple[str | None, ...] = (None, *types)
+        self.__ids: dict[str | None, int] = {type_: id_ for id_, type_ in enumerate(self.__types)}
+
+    @classmethod
+    def from_rows(cls, rows: list[list[str | None]]) -> 'TileGrid':
+        """Build a grid from rows of tile types."""
+        types = list(dict.fromkeys(cell for row in rows for cell in row if cell is not None))
+        ids = {None: 0} | {type_: i + 1 for i, type_ in enumerate(types)}
+        return cls(
+            len(rows[0]) if rows else 0, len(rows), types,
+            bytes(ids[cell] for row in rows for cell in row)
+        )
+
+    '''FUNCTIONS'''
+
+    def id_at(self, x: int, y: int) -> int:
+        """Tile id of a cell, 0 outside the grid."""
+        if 0 <= x < self.__width and 0 <= y < self.__height:
+            return self.__tiles[y * self.__width + x]
+        return 0
+
+    def type_at(self, x: int, y: int) -> str | None:
+        """Tile type of a cell, None when empty or outside the grid."""
+        return self.__types[self.id_at(x, y)]
+
+    def id_of(self, type_: str | None) -> int:
+        """Tile id of a type, 0 for types the grid does not hold."""
+        return self.__ids.get(type_, 0)
+
+    def set(self, x: int, y: int, type_: str | None) -> None:
+        """Change the type of a cell."""
+        if type_ not in self.__ids:
+            raise KeyError(f"Unknown tile type {type_!r}")
+        self.__tiles[y * self.__width + x] = self.__ids[type_]
+
+    def row(self, y: int) -> bytes:
+        """Tile ids of a row."""
+        return bytes(self.__tiles[y * self.__width:(y + 1) * self.__width])
+
+    def column(self, x: int) -> bytes:
+        """Tile ids of a column."""
+        return bytes(self.__tiles[x::self.__width])
+
+    def region(self, x: int, y: int, width: int, height: int) -> 'TileGrid':
+        """Copy of the cells in a rect, clipped to the grid."""
+        left, top = max(x, 0), max(y, 0)
+        right, bottom = min(x + width, self.__width), min(y + height, self.__height)
+        width, height = max(right - left, 0), max(bottom - top, 0)
+
+        tiles = b"".join(self.__tiles[row * self.__width + left:row * self.__width + right] for row in range(top, top + height))
+        return TileGrid(width, height, self.__types[1:], tiles)
+
+    def find(self, type_: str) -> list[tuple[int, int]]:
+        """Every cell of a type, in row-major order."""
+        if (id_ := self.__ids.get(type_)) is None:
+            return []
+
+        positions: list[tuple[int, int]] = []
+        needle = bytes([id_])
+        index = self.__tiles.find(needle)
+        while index != -1:
+            positions.append((index % self.__width, index // self.__width))
+            index = self.__tiles.find(needle, index + 1)
+
+        return positions
+
+    def cells(self) -> Iterator[tuple[int, int, str]]:
+        """Every non-empty cell as (x, y, type), in row-major order."""
+        types = self.__types
+        for y in range(self.__height):
+            row = self.__tiles[y * self.__width:(y + 1) * self.__width]
+            for x, id_ in enumerate(row):
+                if id_:
+                    yield x, y, types[id_]
+
+    def to_rows(self) -> list[list[str | None]]:
+        """Rows of tile types, the old list-of-lists layout."""
+        types = self.__types
+        return [[types[id_] for id_ in self.row(y)] for y in range(self.__height)]
+
+    def close(self) -> None:
+        """Release what the grid holds outside of memory, an in-memory grid holds nothing."""
+        pass
+
+    '''GETTERS'''
+
+    @property
+    def width(self) -> int: return self.__width
+    @property
+    def height(self) -> int: return self.__height
+    @property
+    def size(self) -> tuple[int, int]: return (self.__width, self.__height)
+    @property
+    def types(self) -> tuple[str | None, ...]: return self.__types
+    @property
+    def tiles(self) -> bytearray | mmap.mmap: return self.__tiles
+    @property
+    def array(self) -> 'numpy.ndarray':
+        """The tiles as a (height, width) uint8 NumPy array sharing memory with the grid."""
+        if numpy is None:
+            raise RuntimeError("NumPy is not installed")
+        return numpy.frombuffer(self.__tiles, dtype=numpy.uint8).reshape(self.__height, self.__width)
+
+    '''DUNDERS'''
+
+    def __getitem__(self, position: tuple[int, int]) -> str | None:
+        return self.type_at(*position)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, TileGrid) and self.size == other.size and self.__types == other.types and self.__tiles == other.tiles
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.__width}x{self.__height}, types={self.__types[1:]})"
+
+
+class MappedTileGrid(TileGrid):
+    """Read-only tile grid over a memory-mapped file, pages are only read in when their cells are looked at."""
+    __slots__ = (
+        '__mmap',
+    )
+
+    def __init__(
+        self,
+        filepath: PathLike,
+        width: int,
+        height: int,
+        types: Sequence[str]
+    ) -> None:
+        # The tiles sit at the start of the file, the map keeps its own handle once open
+        with open(filepath, 'rb') as file:
+            self.__mmap = mmap.mmap(file.fileno(), width * height, access=mmap.ACCESS_READ) if width * height else None
+
+        super().__init__(width, height, types, self.__mmap if self.__mmap is not None else b"", share=True)
+
+    '''FUNCTIONS'''
+
+    def set(self, x: int, y: int, type_: str | None) -> None:
+        """Mapped grids are read-only."""
+        raise TypeError("A memory-mapped tile grid is read-only")
+
+    def close(self) -> None:
+        """Unmap the file, the grid can not be read afterwards."""
+        if self.__mmap is not None:
+            self.__mmap.close()
@@ -14,7 +14,8 @@ class Button(pygame.sprite.Sprite):
         '__debug_color',
         '__surface',
         '__effect',
-        '__rect'
+        '__rect',
+        '__hovered'
     )
 
     def __init__(
@@ -31,6 +32,7 @@ class Button(pygame.sprite.Sprite):
         self.__effect = effect
 
         self.__rect = pygame.Rect(*topleft, *surface.get_size())
+        self.__hovered = False
 
     '''FUNCTIONS'''
 
@@ -39,28 +41,30 @@ class Button(pygame.sprite.Sprite):
         if self.__effect is not None:
             self.__effect()
 
-    def update(
-        self,
-        display: Display,
-        pos: tuple[int, int] | None = None
-    ) -> None:
-        """Updates the given surface by blitting text surfaces at the specified position."""
-        if pos is None:
-            pos = self.__rect.topleft
-        else:
-            self.__rect.topleft = pos
+    def hover_enter(self) -> None:
+        """Called when the mouse moves onto the button."""
+        self.__hovered = True
 
+    def hover_leave(self) -> None:
+        """Called when the mouse moves off the button."""
+        self.__hovered = False
+
+    def update(self, display: Display) -> None:
+        """Updates the given surface by blitting the text surface where the button is, buttons do not move once they are filed for hit-testing."""
         display.blit(self.__surface, self.__rect.topleft)
 
     def debug(self, display: Display) -> None:
-        """Draws a debug rectangle on the given surface."""
-        pygame.draw.rect(display.get_internal_surface(), self.__debug_color, self.__rect, 1)
+        """Draws a debug rectangle on the given surface, thicker while hovered."""
+        pygame.draw.rect(display.get_internal_surface(), self.__debug_color, self.__rect, 3 if self.__hovered else 1)
 
     '''GETTERS'''
 
     def get_rect(self) -> pygame.Rect:
         return self.__rect
 
+    def get_hovered(self) -> bool:
+        return self.__hovered
+
     '''DUNDERS'''
 
     def __repr__(self) -> str:
@@ -4,6 +4,8 @@ import pygame
 
 from typing import Any
 
+from hit_test import HitTestIndex
+
 
 type color = tuple[int, int, int]
 
@@ -12,7 +14,7 @@ BACKGROUND_COLOR: color = (180, 180, 180)
 def event_handling(
     keys: dict[int, bool],
     mouse_pos: tuple[int, int],
-    buttons: list[pygame.sprite.Sprite] = []
+    hit_index: HitTestIndex | None = None
 ) -> dict[str, Any]:
     """Handles events such as mouse clicks and keyboard inputs."""
     changed_values: dict[str, Any] = {}
@@ -25,10 +27,8 @@ def event_handling(
             if event.key == pygame.K_SPACE and keys[pygame.K_LCTRL]:
                 changed_values['debug_mode'] = True
         elif event.type == pygame.MOUSEBUTTONDOWN:
-            if event.button == 1:
-                for button in buttons:
-                    if button.get_rect().collidepoint(mouse_pos):
-                        button.clicked()
+            if event.button == 1 and hit_index is not None and (button := hit_index.topmost(mouse_pos)) is not None:
+                button.clicked()
 
     return changed_values
 
@@ -0,0 +1,105 @@
+# hit_test.py
+
+import pygame
+
+from math import floor
+from typing import Any
+
+
+class HitTestIndex:
+    """Uniform grid over buttons, finds the topmost one under a point and tracks which one is hovered.
+
+    Buttons added later are on top, the same order they are drawn in.
+    Kept in step with space_platformer's spatial.HitTestIndex, the template has no spatial hash to build on.
+    """
+    __slots__ = (
+        '__cell_size',
+        '__cells',
+        '__filed',
+        '__depths',
+        '__next_depth',
+        '__hovered'
+    )
+
+    def __init__(self, cell_size: int = 64) -> None:
+        self.__cell_size = cell_size
+        self.__cells: dict[tuple[int, int], list[Any]] = {}
+        self.__filed: dict[Any, list[tuple[int, int]]] = {}  # Cells each button was filed under
+        self.__depths: dict[Any, int] = {}
+        self.__next_depth = 0
+        self.__hovered: Any | None = None
+
+    '''FUNCTIONS'''
+
+    def insert(self, button: Any) -> None:
+        """Add a button on top of every other one."""
+        self.__file(button)
+        self.__depths[button] = self.__next_depth
+        self.__next_depth += 1
+
+    def remove(self, button: Any) -> None:
+        """Remove a button, it stops being hovered."""
+        self.__unfile(button)
+        self.__depths.pop(button, None)
+        if self.__hovered is button:
+            self.__hovered = None
+
+    def move(self, button: Any) -> None:
+        """Re-file a button whose rect changed, keeping its depth."""
+        self.__unfile(button)
+        self.__file(button)
+
+    def topmost(self, point: tuple[float, float]) -> Any | None:
+        """The button on top at a point, None if there is none."""
+        cell = (floor(point[0] / self.__cell_size), floor(point[1] / self.__cell_size))
+        candidates = [button for button in self.__cells.get(cell, ()) if button.get_rect().collidepoint(point)]
+        return max(candidates, key=self.__depths.__getitem__, default=None)
+
+    def hover(self, point: tuple[float, float]) -> tuple[Any | None, Any | None]:
+        """Move the hover to a point, returns the button left and the button entered, None for no change."""
+        if (topmost := self.topmost(point)) is self.__hovered:
+            return None, None
+
+        left, self.__hovered = self.__hovered, topmost
+        return left, topmost
+
+    def clear(self) -> None:
+        """Remove every button."""
+        self.__cells.clear()
+        self.__filed.clear()
+        self.__depths.clear()
+        self.__hovered = None
+
+    def __file(self, button: Any) -> None:
+        """File a button under the cells its rect covers now."""
+        self.__filed[button] = self.__cells_of(button.get_rect())
+        for cell in self.__filed[button]:
+            self.__cells.setdefault(cell, []).append(button)
+
+    def __unfile(self, button: Any) -> None:
+        """Take a button out of the cells it was filed under."""
+        for cell in self.__filed.pop(button, ()):
+            bucket = self.__cells[cell]
+            bucket.remove(button)
+            if not bucket:
+                del self.__cells[cell]
+
+    def __cells_of(self, rect: pygame.Rect) -> list[tuple[int, int]]:
+        """Cells covered by a rect."""
+        first_x, first_y = rect.left // self.__cell_size, rect.top // self.__cell_size
+        last_x = (rect.right - 1) // self.__cell_size
+        last_y = (rect.bottom - 1) // self.__cell_size
+        return [(x, y) for y in range(first_y, last_y + 1) for x in range(first_x, last_x + 1)]
+
+    '''GETTERS'''
+
+    def get_hovered(self) -> Any | None:
+        return self.__hovered
+
+    '''DUNDERS'''
+
+    def __len__(self) -> int:
+        return len(self.__depths)
+
+    def __contains__(self, button: Any) -> bool:
+        return button in self.__depths
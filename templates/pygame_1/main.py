@@ -9,6 +9,7 @@ from typing import Any
 import game
 from button import Button
 from display import Display
+from hit_test import HitTestIndex
 
 
 def main() -> None:
@@ -39,6 +40,11 @@ def main() -> None:
         effect=lambda: setattr(game, 'BACKGROUND_COLOR', (255, 0, 0)),
     ))
 
+    # Buttons by position, so clicks and hover only look at the ones under the mouse
+    hit_index = HitTestIndex()
+    for button in buttons:
+        hit_index.insert(button)
+
     # Main loop
     while True:
         # Get held keys
@@ -48,7 +54,14 @@ def main() -> None:
         scaled_mouse_pos = pygame.mouse.get_pos()
         mouse_pos = ([x * y / z for x, y, z in zip(scaled_mouse_pos, display.get_internal_surface().get_size(), display.get_screen().get_size())])
 
-        changed_values: dict[str, Any] = game.event_handling(keys, mouse_pos, buttons)
+        changed_values: dict[str, Any] = game.event_handling(keys, mouse_pos, hit_index)
+
+        # Only the buttons the mouse moved onto or off of hear about it
+        left, entered = hit_index.hover(mouse_pos)
+        if left is not None:
+            left.hover_leave()
+        if entered is not None:
+            entered.hover_enter()
 
         tracked_values['mouse_pos'] = mouse_pos # Logic for converting from changed_values format to actual data
         tracked_values['debug_mode'] = not tracked_values['debug_mode'] if 'debug_mode' in changed_values else tracked_values['debug_mode']
@@ -69,13 +82,9 @@ def main() -> None:
             tracked_values["mouse_pos"] = mouse_pos
 
             # Button hover
-            button_hovered = False
-            for button in buttons:
-                if button.get_rect().collidepoint(mouse_pos):
-                    tracked_values["button_hover"] = button
-                    button_hovered = True
-                    break
-            if not button_hovered:
+            if (button := hit_index.get_hovered()) is not None:
+                tracked_values["button_hover"] = button
+            else:
                 tracked_values.pop("button_hover", None)
 
         # Update display